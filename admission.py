@@ -0,0 +1,143 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+RATE_LIMIT_RPS = float(os.environ.get('RATE_LIMIT_RPS', 20))
+RATE_LIMIT_BURST = float(os.environ.get('RATE_LIMIT_BURST', 40))
+CLIENT_RATE_LIMIT_RPS = float(os.environ.get('CLIENT_RATE_LIMIT_RPS', 2))
+CLIENT_RATE_LIMIT_BURST = float(os.environ.get('CLIENT_RATE_LIMIT_BURST', 10))
+ADMISSION_MAX_WAITING = int(os.environ.get('ADMISSION_MAX_WAITING', 32))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 5))
+MAX_TRACKED_CLIENTS = int(os.environ.get('MAX_TRACKED_CLIENTS', 10000))
+
+
+class TokenBucket:
+    """Token bucket that allows reservations, letting the balance go negative
+
+    A rate of zero or less means unlimited.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, cost=1.0):
+        """Seconds until cost tokens are available (assumes refill() was called)"""
+        if self.rate <= 0 or self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def take(self, cost=1.0):
+        if self.rate > 0:
+            self.tokens -= cost
+
+
+class RateLimited(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(f"Rate limited ({reason}), retry after {retry_after:.1f}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self):
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class AdmissionController:
+    """Global and per-client token buckets in front of a bounded wait queue
+
+    A request that finds tokens is admitted at once. Otherwise it reserves
+    its tokens and sleeps until they refill, provided that takes no longer
+    than max_wait and fewer than max_waiting requests are already queued;
+    if not it is rejected straight away with a suggested Retry-After.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_RPS, burst=RATE_LIMIT_BURST,
+                 client_rate=CLIENT_RATE_LIMIT_RPS, client_burst=CLIENT_RATE_LIMIT_BURST,
+                 max_waiting=ADMISSION_MAX_WAITING, max_wait=ADMISSION_MAX_WAIT,
+                 max_clients=MAX_TRACKED_CLIENTS):
+        self.bucket = TokenBucket(rate, burst)
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_waiting = max_waiting
+        self.max_wait = max_wait
+        self.max_clients = max_clients
+        self.clients = OrderedDict()
+        self.waiting = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {'global': 0, 'client': 0, 'queue': 0}
+        self._lock = threading.Lock()
+
+    def _client_bucket(self, client_id):
+        bucket = self.clients.get(client_id)
+        if bucket is None:
+            bucket = self.clients[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            if len(self.clients) > self.max_clients:
+                self.clients.popitem(last=False)
+        else:
+            self.clients.move_to_end(client_id)
+        return bucket
+
+    def scale(self, share):
+        """Keep only share of every rate and burst, for one of several processes splitting the traffic"""
+        with self._lock:
+            self.bucket = TokenBucket(self.bucket.rate * share, self.bucket.burst * share)
+            self.client_rate *= share
+            self.client_burst *= share
+            self.clients.clear()
+
+    def admit(self, client_id, cost=1.0, max_wait=None):
+        """Block until the request may proceed, or raise RateLimited
+
+        max_wait overrides the controller's limit on how long this call may wait for tokens.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        with self._lock:
+            now = time.monotonic()
+            client = self._client_bucket(client_id)
+            self.bucket.refill(now)
+            client.refill(now)
+            client_wait = client.wait_time(cost)
+            global_wait = self.bucket.wait_time(cost)
+            wait = max(client_wait, global_wait)
+            if wait > 0:
+                if client_wait > max_wait:
+                    self.rejected['client'] += 1
+                    raise RateLimited('client', client_wait)
+                if global_wait > max_wait:
+                    self.rejected['global'] += 1
+                    raise RateLimited('global', global_wait)
+                if self.waiting >= self.max_waiting:
+                    self.rejected['queue'] += 1
+                    raise RateLimited('queue', wait)
+                self.waiting += 1
+                self.queued += 1
+            self.bucket.take(cost)
+            client.take(cost)
+            self.admitted += 1
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queue_depth': self.waiting,
+                'admitted': self.admitted,
+                'queued': self.queued,
+                'rejected': dict(self.rejected),
+                'tracked_clients': len(self.clients),
+            }
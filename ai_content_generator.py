@@ -1,13 +1,15 @@
-import requests
+import provider_client
+from retry_policy import RetryPolicy, ProviderError
 import os
 import random
 
 class AIContentGenerator:
-    def __init__(self, openrouter_api_key):
+    def __init__(self, openrouter_api_key, retry_policy=None):
         """
         Initialize AI Content Generator with OpenRouter.ai API key
         """
         self.api_key = openrouter_api_key
+        self.retry_policy = retry_policy or RetryPolicy()
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -53,31 +55,33 @@ Example format:
 {('#Hashtag1 #Hashtag2 #Hashtag3' if include_hashtags else '')}
 
 Generate the post:"""
+        payload = {
+            "model": "mistralai/mistral-small-3.2-24b-instruct:free",
+            "messages": [
+                {"role": "system", "content": "You are a professional LinkedIn content creator. Create engaging, authentic posts that drive engagement and provide value to the audience."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 300,
+            "temperature": 0.7
+        }
         try:
-            response = requests.post(
-                self.base_url,
-                headers=self.headers,
-                json={
-                    "model": "mistralai/mistral-small-3.2-24b-instruct:free",
-                    "messages": [
-                        {"role": "system", "content": "You are a professional LinkedIn content creator. Create engaging, authentic posts that drive engagement and provide value to the audience."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "max_tokens": 300,
-                    "temperature": 0.7
-                }
-            )
-            if response.status_code == 200:
-                result = response.json()
-                generated_text = result['choices'][0]['message']['content'].strip()
-                return generated_text
-            else:
-                print(f"❌ Error generating text: {response.status_code} - {response.text}")
-                return self._get_fallback_text(topic, industry, tone, include_hashtags)
+            response = self.retry_policy.call(lambda: self._post_completion(payload))
+            result = response.json()
+            generated_text = result['choices'][0]['message']['content'].strip()
+            return generated_text
+        except ProviderError as e:
+            print(f"❌ Error generating text: {e}")
+            return self._get_fallback_text(topic, industry, tone, include_hashtags)
         except Exception as e:
             print(f"❌ Error in text generation: {e}")
             return self._get_fallback_text(topic, industry, tone, include_hashtags)
 
+    def _post_completion(self, payload):
+        response = provider_client.post(self.base_url, headers=self.headers, json=payload)
+        if response.status_code != 200:
+            raise ProviderError.from_response('OpenRouter', response)
+        return response
+
     def generate_complete_post(self, topic=None, industry=None, tone="professional", **kwargs):
         """
         Generate a complete LinkedIn post with text only (no image)
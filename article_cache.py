@@ -0,0 +1,155 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+ARTICLE_CACHE_DIR = os.environ.get('ARTICLE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.article_cache'))
+ARTICLE_CACHE_MAX_BYTES = int(os.environ.get('ARTICLE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+ARTICLE_CACHE_FRESH_SECONDS = float(os.environ.get('ARTICLE_CACHE_FRESH_SECONDS', 900))
+ARTICLE_CACHE_L2_TTL = float(os.environ.get('ARTICLE_CACHE_L2_TTL', 7 * 24 * 3600))
+
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid',
+    'ref', 'ref_src', 'ref_url', 'cmpid', 'trk', 'trackingid', 'si',
+}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonicalize_url(url):
+    """Normalize an article URL so tracking variants share one cache entry"""
+    parts = urlsplit((url or '').strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith('utm_') and k.lower() not in TRACKING_PARAMS
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((scheme, host, path, urlencode(sorted(query)), ''))
+
+
+class ArticleCache:
+    """Disk-backed, gzip-compressed store of extracted articles with a size cap
+
+    With an `l2` cache, entries missing on this host's disk are looked up there
+    (and copied locally), and every write also goes to the L2.
+    """
+
+    def __init__(self, directory=ARTICLE_CACHE_DIR, max_bytes=ARTICLE_CACHE_MAX_BYTES, fresh_seconds=ARTICLE_CACHE_FRESH_SECONDS,
+                 l2=None, l2_ttl=ARTICLE_CACHE_L2_TTL):
+        self.l2 = l2
+        self.l2_ttl = l2_ttl
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self._lock = threading.Lock()
+        self._sizes = {}
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith('.json.gz'):
+                try:
+                    self._sizes[name] = os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    pass
+        self._total = sum(self._sizes.values())
+
+    def _name(self, canonical_url):
+        return hashlib.sha256(canonical_url.encode('utf-8')).hexdigest() + '.json.gz'
+
+    def get(self, canonical_url):
+        """Return the stored entry dict, or None"""
+        path = os.path.join(self.directory, self._name(canonical_url))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return self._get_l2(canonical_url)
+        if entry.get('url') != canonical_url:
+            return None
+        return entry
+
+    def _get_l2(self, canonical_url):
+        if self.l2 is None:
+            return None
+        entry = self.l2.get(canonical_url)
+        if not isinstance(entry, dict) or entry.get('url') != canonical_url:
+            return None
+        self._write(canonical_url, entry, l2=False)
+        return entry
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get('validated_at', 0) < self.fresh_seconds
+
+    def covers(self, entry, text_target):
+        """Whether entry holds at least text_target chars of the page (or the whole page)"""
+        return not entry.get('truncated', True) or (entry.get('text_target') or 0) >= text_target
+
+    def put(self, canonical_url, title, content, etag=None, last_modified=None, truncated=False, text_target=None):
+        entry = {
+            'url': canonical_url,
+            'title': title,
+            'content': content,
+            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest(),
+            'etag': etag,
+            'last_modified': last_modified,
+            'truncated': truncated,
+            'text_target': text_target,
+            'validated_at': time.time(),
+        }
+        self._write(canonical_url, entry)
+        return entry
+
+    def touch(self, canonical_url, entry):
+        """Record a successful revalidation (304) of an existing entry"""
+        entry['validated_at'] = time.time()
+        self._write(canonical_url, entry)
+        return entry
+
+    def _write(self, canonical_url, entry, l2=True):
+        if l2 and self.l2 is not None:
+            self.l2.set(canonical_url, entry, self.l2_ttl)
+        name = self._name(canonical_url)
+        data = gzip.compress(json.dumps(entry).encode('utf-8'))
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.directory, name))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._total += len(data) - self._sizes.get(name, 0)
+            self._sizes[name] = len(data)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Least recently read entries go first; reads bump the file mtime
+        def mtime(name):
+            try:
+                return os.path.getmtime(os.path.join(self.directory, name))
+            except OSError:
+                return 0
+        for name in sorted(self._sizes, key=mtime):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            self._total -= self._sizes.pop(name)
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._sizes), 'bytes': self._total}
@@ -0,0 +1,174 @@
+import os
+import re
+import socket
+import threading
+
+from lxml import etree
+
+import provider_client
+from deadline import DeadlineExceeded
+
+ARTICLE_MAX_BYTES = int(os.environ.get('ARTICLE_MAX_BYTES', 2 * 1024 * 1024))
+ARTICLE_TEXT_TARGET = int(os.environ.get('ARTICLE_TEXT_TARGET', 6000))
+ARTICLE_CHUNK_SIZE = int(os.environ.get('ARTICLE_CHUNK_SIZE', 16 * 1024))
+MIN_BLOCK_CHARS = 40
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+SKIP_TAGS = {'script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'svg', 'iframe', 'template'}
+BLOCK_TAGS = {'p', 'h2', 'h3', 'blockquote', 'pre', 'li'}
+
+
+class ArticleFetchError(Exception):
+    pass
+
+
+class FetchResult:
+    def __init__(self, status, headers, title='', text='', html=b'', bytes_read=0, truncated=False):
+        self.status = status
+        self.headers = headers
+        self.title = title
+        self.text = text
+        self.html = html
+        self.bytes_read = bytes_read
+        self.truncated = truncated
+
+
+def _clean(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def _charset(content_type):
+    match = re.search(r'charset=["\']?([\w-]+)', content_type or '', re.I)
+    return match.group(1) if match else None
+
+
+class TextCollector:
+    """Pulls article text out of an incrementally parsed HTML document"""
+
+    def __init__(self, encoding=None):
+        self.parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding, remove_comments=True)
+        self.skip_depth = 0
+        self.title = ''
+        self.og_title = ''
+        self.blocks = []
+        self.chars = 0
+
+    def feed(self, data):
+        self.parser.feed(data)
+        self._drain()
+
+    def close(self):
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self._drain()
+
+    def _drain(self):
+        for event, element in self.parser.read_events():
+            tag = element.tag if isinstance(element.tag, str) else ''
+            if event == 'start':
+                if tag in SKIP_TAGS:
+                    self.skip_depth += 1
+                elif tag == 'meta' and element.get('property') == 'og:title' and not self.og_title:
+                    self.og_title = _clean(element.get('content'))
+                continue
+            if tag in SKIP_TAGS:
+                self.skip_depth = max(0, self.skip_depth - 1)
+            elif tag == 'title' and not self.title:
+                self.title = _clean(element.text)
+            elif tag in BLOCK_TAGS and not self.skip_depth:
+                # A list item wrapping paragraphs is collected through its paragraphs
+                if not (tag == 'li' and element.find('.//p') is not None):
+                    text = _clean(''.join(element.itertext()))
+                    if len(text) >= MIN_BLOCK_CHARS:
+                        self.blocks.append(text)
+                        self.chars += len(text) + 1
+            if tag not in ('html', 'body'):
+                # Finished subtrees are never looked at again; drop them to keep memory flat
+                element.clear(keep_tail=True)
+
+    @property
+    def text(self):
+        return '\n'.join(self.blocks)
+
+
+def _abort(response, expired):
+    """Watchdog for a body read that outlives the deadline
+
+    The read timeout applies to each recv, so a server dripping a byte at a
+    time never trips it; shutting the socket down makes the blocked read return.
+    """
+    expired.set()
+    sock = getattr(getattr(response.raw, '_connection', None), 'sock', None)
+    if sock is None:
+        # http.client lets go of the connection's socket for Connection: close responses;
+        # the response's own file still wraps it
+        fp = getattr(getattr(response.raw, '_fp', None), 'fp', None)
+        sock = getattr(getattr(fp, 'raw', None), '_sock', None)
+    if sock is None:
+        response.close()
+        return
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def fetch_article(url, headers=None, timeout=None, deadline=None,
+                  max_bytes=ARTICLE_MAX_BYTES, text_target=ARTICLE_TEXT_TARGET):
+    """Stream an HTML page, extracting text until text_target chars or max_bytes
+
+    The raw bytes read so far are kept on the result so another extractor
+    can be tried on the same (capped) document. The whole body read ends by
+    the deadline, however slowly the server sends it.
+    """
+    response = provider_client.get_article(url, headers=headers, timeout=timeout, stream=True)
+    expired = threading.Event()
+    remaining = deadline.remaining() if deadline is not None else None
+    watchdog = threading.Timer(remaining, _abort, (response, expired)) if remaining is not None else None
+    if watchdog is not None:
+        watchdog.daemon = True
+        watchdog.start()
+    try:
+        if response.status_code != 200:
+            return FetchResult(response.status_code, response.headers)
+        content_type = response.headers.get('Content-Type', '')
+        if content_type and content_type.split(';')[0].strip().lower() not in HTML_CONTENT_TYPES:
+            raise ArticleFetchError(f"Unsupported content type: {content_type}")
+
+        collector = TextCollector(_charset(content_type))
+        raw = bytearray()
+        truncated = False
+        try:
+            for chunk in response.iter_content(chunk_size=ARTICLE_CHUNK_SIZE):
+                if deadline is not None:
+                    deadline.check()
+                if not chunk:
+                    continue
+                chunk = chunk[:max_bytes - len(raw)]
+                raw.extend(chunk)
+                collector.feed(chunk)
+                if collector.chars >= text_target or len(raw) >= max_bytes:
+                    truncated = True
+                    break
+        except Exception:
+            if expired.is_set():
+                raise DeadlineExceeded("Article fetch ran past the request deadline")
+            raise
+        if expired.is_set():
+            # The shut-down socket can also look like a page that simply ended
+            raise DeadlineExceeded("Article fetch ran past the request deadline")
+        collector.close()
+        return FetchResult(
+            200, response.headers,
+            title=collector.og_title or collector.title,
+            text=collector.text,
+            html=bytes(raw),
+            bytes_read=len(raw),
+            truncated=truncated
+        )
+    finally:
+        if watchdog is not None:
+            watchdog.cancel()
+        response.close()
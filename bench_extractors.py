@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark article extraction backends over the saved pages in bench_fixtures/articles
+
+Each NAME.html fixture has a NAME.txt file holding the article body a good
+extractor should return. For every backend we report the median parse time
+and token-level precision / recall / F1 against that text.
+
+Usage: python bench_extractors.py [--runs 20] [--backends lxml,stream,newspaper]
+"""
+
+import argparse
+import os
+import re
+import statistics
+import time
+from collections import Counter
+
+from extractors import BACKENDS
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures', 'articles')
+
+
+def tokens(text):
+    return Counter(re.findall(r'\w+', text.lower()))
+
+
+def quality(extracted, expected):
+    got, want = tokens(extracted), tokens(expected)
+    overlap = sum((got & want).values())
+    precision = overlap / sum(got.values()) if got else 0.0
+    recall = overlap / sum(want.values()) if want else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
+
+
+def load_fixtures():
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if name.endswith('.html'):
+            base = name[:-5]
+            with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+                html = f.read()
+            with open(os.path.join(FIXTURE_DIR, base + '.txt'), encoding='utf-8') as f:
+                expected = f.read()
+            fixtures.append((base, html, expected))
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='timed runs per page and backend')
+    parser.add_argument('--backends', default=','.join(BACKENDS), help='comma-separated backend names')
+    args = parser.parse_args()
+
+    fixtures = load_fixtures()
+    print(f"📚 {len(fixtures)} fixtures, {args.runs} runs each\n")
+    print(f"{'backend':<10} {'page':<28} {'KB':>6} {'ms':>8} {'chars':>7} {'prec':>6} {'rec':>6} {'f1':>6}")
+    print('-' * 84)
+
+    for backend_name in [b.strip() for b in args.backends.split(',') if b.strip()]:
+        backend = BACKENDS[backend_name]()
+        if not backend.available():
+            print(f"{backend_name:<10} ⚠️  not installed, skipped")
+            continue
+        times, f1s = [], []
+        for page, html, expected in fixtures:
+            samples = []
+            result = None
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                result = backend.extract(html, f'https://example.com/{page}')
+                samples.append((time.perf_counter() - start) * 1000)
+            median = statistics.median(samples)
+            precision, recall, f1 = quality(result['content'], expected)
+            times.append(median)
+            f1s.append(f1)
+            print(f"{backend_name:<10} {page:<28} {len(html) / 1024:>6.1f} {median:>8.2f} {len(result['content']):>7} "
+                  f"{precision:>6.2f} {recall:>6.2f} {f1:>6.2f}")
+        print(f"{backend_name:<10} {'MEAN':<28} {'':>6} {statistics.mean(times):>8.2f} {'':>7} {'':>6} {'':>6} {statistics.mean(f1s):>6.2f}")
+        print('-' * 84)
+
+
+if __name__ == "__main__":
+    main()
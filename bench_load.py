@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Load-test a running server.py over /api/generate-post at a fixed concurrency
+
+Each of --concurrency workers sends requests back to back over its own
+keep-alive connection until --requests have been sent (or --duration
+seconds have passed). Reports throughput, latency percentiles, the error
+rate and the X-Cache mix. Topics are unique per request unless --distinct
+limits them, so by default every request is a cache miss that reaches the
+provider; run the server against mock_providers.py to avoid spending quota.
+
+The server's rate limits apply (429s, or requests queued for admission).
+Workers share the caller's IP bucket unless --api-keys lists keys that are
+also in the server's CLIENT_API_KEYS; raise RATE_LIMIT_RPS and
+CLIENT_RATE_LIMIT_RPS on the server to measure raw throughput.
+
+Usage: python bench_load.py [--url http://127.0.0.1:8000] [--concurrency 16] [--requests 500]
+       python bench_load.py --duration 30 --distinct 50 --path /api/generate-post/stream
+"""
+
+import argparse
+import http.client
+import json
+import math
+import statistics
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import urlsplit
+
+INDUSTRIES = ['technology', 'marketing', 'business', 'finance', 'startup']
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoadRun:
+    def __init__(self, url, path, total, duration, distinct, timeout, model, no_cache, api_keys):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.https = parts.scheme == 'https'
+        self.path = path
+        self.total = total
+        self.duration = duration
+        self.distinct = distinct
+        self.timeout = timeout
+        self.model = model
+        self.no_cache = no_cache
+        self.api_keys = api_keys
+        self.run_id = uuid.uuid4().hex[:8]
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.latencies = []
+        self.statuses = Counter()
+        self.cache = Counter()
+        self.reconnects = 0
+
+    def next_index(self):
+        with self.lock:
+            if self.total is not None and self.issued >= self.total:
+                return None
+            if self.duration is not None and time.monotonic() >= self.deadline:
+                return None
+            self.issued += 1
+            return self.issued - 1
+
+    def payload(self, index):
+        subject = index % self.distinct if self.distinct else index
+        body = {
+            'type': 'topic',
+            'topic': f'Lessons from scaling team {subject} ({self.run_id})',
+            'industry': INDUSTRIES[subject % len(INDUSTRIES)],
+            'tone': 'professional',
+            'word_count': 80,
+        }
+        if self.model:
+            body['model'] = self.model
+        if self.no_cache:
+            body['cache'] = False
+        return json.dumps(body).encode()
+
+    def connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def worker(self, number):
+        headers = {'Content-Type': 'application/json'}
+        if self.api_keys:
+            headers['X-API-Key'] = self.api_keys[number % len(self.api_keys)]
+        conn = self.connect()
+        while True:
+            index = self.next_index()
+            if index is None:
+                break
+            body = self.payload(index)
+            start = time.perf_counter()
+            try:
+                conn.request('POST', self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                status, cache = response.status, response.getheader('X-Cache') or '-'
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+                    conn = self.connect()
+            except (OSError, http.client.HTTPException) as e:
+                status, cache = type(e).__name__, '-'
+                conn.close()
+                conn = self.connect()
+                with self.lock:
+                    self.reconnects += 1
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.latencies.append(elapsed)
+                self.statuses[status] += 1
+                self.cache[cache] += 1
+        conn.close()
+
+    def run(self, concurrency):
+        self.deadline = time.monotonic() + (self.duration or 0)
+        threads = [threading.Thread(target=self.worker, args=(number,), daemon=True) for number in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='server base URL')
+    parser.add_argument('--path', default='/api/generate-post')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=500, help='total requests (ignored with --duration)')
+    parser.add_argument('--duration', type=float, default=None, help='run for this many seconds instead')
+    parser.add_argument('--distinct', type=int, default=0, help='number of distinct topics to cycle through (0 = all unique)')
+    parser.add_argument('--model', default=None, help='gemini or openrouter (server default if unset)')
+    parser.add_argument('--no-cache', action='store_true', help='send "cache": false so every request generates')
+    parser.add_argument('--api-keys', default='', help='comma-separated X-API-Key values spread over the workers')
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    run = LoadRun(args.url, args.path, None if args.duration else args.requests, args.duration,
+                  args.distinct, args.timeout, args.model, args.no_cache,
+                  [key.strip() for key in args.api_keys.split(',') if key.strip()])
+    limit = f"{args.duration:.0f}s" if args.duration else f"{args.requests} requests"
+    print(f"🚀 {limit} to {args.url}{args.path} at concurrency {args.concurrency}\n")
+    elapsed = run.run(args.concurrency)
+
+    latencies = sorted(run.latencies)
+    done = len(latencies)
+    errors = sum(n for status, n in run.statuses.items() if status != 200)
+    print(f"{'requests':<14} {done}")
+    print(f"{'elapsed':<14} {elapsed:.2f}s")
+    print(f"{'throughput':<14} {done / elapsed if elapsed else 0:.1f} req/s")
+    print(f"{'error rate':<14} {errors / done * 100 if done else 0:.2f}% ({errors})")
+    if latencies:
+        print(f"{'latency ms':<14} p50 {percentile(latencies, 50) * 1000:.1f}  p95 {percentile(latencies, 95) * 1000:.1f}  "
+              f"p99 {percentile(latencies, 99) * 1000:.1f}  max {latencies[-1] * 1000:.1f}  mean {statistics.mean(latencies) * 1000:.1f}")
+    print(f"{'statuses':<14} " + ', '.join(f'{status}: {n}' for status, n in run.statuses.most_common()))
+    print(f"{'X-Cache':<14} " + ', '.join(f'{cache}: {n}' for cache, n in run.cache.most_common()))
+    if run.reconnects:
+        print(f"{'reconnects':<14} {run.reconnects}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the extractive summarizer over the article texts in bench_fixtures/articles
+
+For every NAME.txt fixture we report the median summarization time, the
+token counts before and after, and how many of the article's key terms
+(top TF-IDF terms across the fixture set) survive in the summary compared
+with the old blind prefix cut of the same length.
+
+Usage: python bench_summarizer.py [--runs 20] [--budget 350]
+"""
+
+import argparse
+import math
+import os
+import re
+import statistics
+import time
+from collections import Counter
+
+from summarizer import summarize, estimate_tokens, STOPWORDS, SUMMARY_TOKEN_BUDGET
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench_fixtures', 'articles')
+KEY_TERMS = 25
+
+
+def terms(text):
+    return [w for w in re.findall(r'[a-z0-9]+', text.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def load_texts():
+    texts = []
+    for name in sorted(os.listdir(FIXTURE_DIR)):
+        if name.endswith('.txt'):
+            with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+                texts.append((name[:-4], f.read()))
+    return texts
+
+
+def key_terms(texts):
+    """Top TF-IDF terms of every text, treating each fixture as one document"""
+    counts = {page: Counter(terms(text)) for page, text in texts}
+    doc_freq = Counter(t for c in counts.values() for t in c)
+    keys = {}
+    for page, c in counts.items():
+        weights = {t: n * math.log(len(texts) / doc_freq[t] + 1) for t, n in c.items()}
+        keys[page] = set(sorted(weights, key=weights.get, reverse=True)[:KEY_TERMS])
+    return keys
+
+
+def coverage(text, keys):
+    return len(keys & set(terms(text))) / len(keys) if keys else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20, help='timed runs per article')
+    parser.add_argument('--budget', type=int, default=SUMMARY_TOKEN_BUDGET, help='summary token budget')
+    args = parser.parse_args()
+
+    texts = load_texts()
+    keys = key_terms(texts)
+    print(f"📚 {len(texts)} articles, {args.runs} runs each, budget {args.budget} tokens\n")
+    print(f"{'page':<28} {'tokens':>7} {'summary':>8} {'ms':>8} {'keys':>6} {'prefix':>7}")
+    print('-' * 70)
+
+    times, summary_cov, prefix_cov = [], [], []
+    for page, text in texts:
+        samples = []
+        summary = ''
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            summary = summarize(text, args.budget)
+            samples.append((time.perf_counter() - start) * 1000)
+        median = statistics.median(samples)
+        prefix = text[:len(summary)]
+        times.append(median)
+        summary_cov.append(coverage(summary, keys[page]))
+        prefix_cov.append(coverage(prefix, keys[page]))
+        print(f"{page:<28} {estimate_tokens(text):>7} {estimate_tokens(summary):>8} {median:>8.2f} "
+              f"{summary_cov[-1]:>6.2f} {prefix_cov[-1]:>7.2f}")
+    print('-' * 70)
+    print(f"{'MEAN':<28} {'':>7} {'':>8} {statistics.mean(times):>8.2f} "
+          f"{statistics.mean(summary_cov):>6.2f} {statistics.mean(prefix_cov):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
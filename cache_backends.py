@@ -0,0 +1,362 @@
+import hashlib
+import json
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, unquote
+
+from response_cache import ResponseCache
+
+CACHE_PREFIX = os.environ.get('CACHE_PREFIX', 'lpg')
+CACHE_URL = os.environ.get('CACHE_URL', 'redis://127.0.0.1:6379/0')
+CACHE_DISK_DIR = os.environ.get('CACHE_DISK_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache'))
+CACHE_DISK_MAX_BYTES = int(os.environ.get('CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024))
+CACHE_MEMORY_MAX_BYTES = int(os.environ.get('CACHE_MEMORY_MAX_BYTES', 64 * 1024 * 1024))
+CACHE_COMPRESS_MIN_BYTES = int(os.environ.get('CACHE_COMPRESS_MIN_BYTES', 512))
+CACHE_REDIS_TIMEOUT = float(os.environ.get('CACHE_REDIS_TIMEOUT', 0.25))
+CACHE_REDIS_POOL_SIZE = int(os.environ.get('CACHE_REDIS_POOL_SIZE', 16))
+CACHE_REDIS_RETRY_SECONDS = float(os.environ.get('CACHE_REDIS_RETRY_SECONDS', 5))
+
+RAW = b'j'
+COMPRESSED = b'z'
+
+
+def encode(value, compress_min=CACHE_COMPRESS_MIN_BYTES):
+    """JSON-serialize value, zlib-compressing it when it is large enough to benefit"""
+    data = json.dumps(value, separators=(',', ':')).encode('utf-8')
+    if len(data) >= compress_min:
+        packed = zlib.compress(data, 6)
+        if len(packed) < len(data):
+            return COMPRESSED + packed
+    return RAW + data
+
+
+def decode(data):
+    if data[:1] == COMPRESSED:
+        return json.loads(zlib.decompress(data[1:]))
+    return json.loads(data[1:])
+
+
+class MemoryBackend:
+    """Process-local bytes store (an LRU ResponseCache); the default when nothing is shared"""
+    name = 'memory'
+
+    def __init__(self, max_bytes=CACHE_MEMORY_MAX_BYTES):
+        self.store = ResponseCache(max_entries=1_000_000, max_bytes=max_bytes)
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, data, ttl):
+        self.store.set(key, data, ttl)
+
+    def delete(self, key):
+        self.store.delete(key)
+
+    def stats(self):
+        return self.store.stats()
+
+
+class DiskBackend:
+    """One file per key under a directory, with the expiry time in an 8-byte header"""
+    name = 'disk'
+    EXPIRY = struct.Struct('!d')
+
+    def __init__(self, directory=CACHE_DISK_DIR, max_bytes=CACHE_DISK_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}
+        for name in os.listdir(directory):
+            if name.endswith('.bin'):
+                try:
+                    self._sizes[name] = os.path.getsize(os.path.join(directory, name))
+                except OSError:
+                    pass
+        self._total = sum(self._sizes.values())
+
+    def _name(self, key):
+        return hashlib.sha256(key.encode('utf-8')).hexdigest() + '.bin'
+
+    def get(self, key):
+        path = os.path.join(self.directory, self._name(key))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            data = b''
+        if len(data) < self.EXPIRY.size or self.EXPIRY.unpack_from(data)[0] <= time.time():
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data[self.EXPIRY.size:]
+
+    def set(self, key, data, ttl):
+        name = self._name(key)
+        payload = self.EXPIRY.pack(time.time() + ttl) + data
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp, os.path.join(self.directory, name))
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self._total += len(payload) - self._sizes.get(name, 0)
+            self._sizes[name] = len(payload)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def delete(self, key):
+        name = self._name(key)
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass
+        with self._lock:
+            self._total -= self._sizes.pop(name, 0)
+
+    def _evict(self):
+        # Oldest writes go first
+        def mtime(name):
+            try:
+                return os.path.getmtime(os.path.join(self.directory, name))
+            except OSError:
+                return 0
+        for name in sorted(self._sizes, key=mtime):
+            if self._total <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            self._total -= self._sizes.pop(name)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'entries': len(self._sizes), 'bytes': self._total, 'hits': self.hits, 'misses': self.misses,
+                    'hit_ratio': (self.hits / lookups) if lookups else 0.0}
+
+
+class SharedMemoryBackend:
+    """The host-wide mmap table shared by pre-forked workers"""
+    name = 'shm'
+
+    def __init__(self):
+        from shared_cache import SharedCache
+        self.table = SharedCache()
+
+    def get(self, key):
+        return self.table.get(key)
+
+    def set(self, key, data, ttl):
+        self.table.set(key, data, ttl)
+
+    def delete(self, key):
+        self.table.delete(key)
+
+    def stats(self):
+        return self.table.stats()
+
+
+class RespError(Exception):
+    pass
+
+
+class RedisBackend:
+    """Minimal RESP client for Redis (or anything speaking its protocol)
+
+    Connections are pooled and use short timeouts. The cache is an optimisation,
+    so a failing server turns into misses for CACHE_REDIS_RETRY_SECONDS rather
+    than errors.
+    """
+    name = 'redis'
+
+    def __init__(self, url=CACHE_URL, timeout=CACHE_REDIS_TIMEOUT, pool_size=CACHE_REDIS_POOL_SIZE):
+        parts = urlsplit(url)
+        self.host = parts.hostname or '127.0.0.1'
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip('/') or 0)
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile('rb'))
+        if self.password:
+            self._roundtrip(conn, ('AUTH', self.password))
+        if self.db:
+            self._roundtrip(conn, ('SELECT', self.db))
+        return conn
+
+    def _roundtrip(self, conn, args):
+        sock, reader = conn
+        out = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode('utf-8')
+            out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        sock.sendall(b''.join(out))
+        return self._read_reply(reader)
+
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line.endswith(b'\r\n'):
+            raise ConnectionError('Connection closed by cache server')
+        kind, rest = line[:1], line[1:-2]
+        if kind == b'+':
+            return rest.decode('utf-8')
+        if kind == b'-':
+            raise RespError(rest.decode('utf-8', errors='replace'))
+        if kind == b':':
+            return int(rest)
+        if kind == b'$':
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            if len(data) != length + 2:
+                raise ConnectionError('Connection closed by cache server')
+            return data[:-2]
+        if kind == b'*':
+            count = int(rest)
+            return None if count < 0 else [self._read_reply(reader) for _ in range(count)]
+        raise RespError(f'Unexpected reply: {line[:40]!r}')
+
+    def command(self, *args):
+        """Run one command; raises OSError/RespError"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            reply = self._roundtrip(conn, args)
+        except BaseException:
+            conn[0].close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn[0].close()
+        return reply
+
+    def _call(self, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.command(*args)
+        except (OSError, RespError) as e:
+            with self._lock:
+                self.errors += 1
+                self._down_until = time.monotonic() + CACHE_REDIS_RETRY_SECONDS
+            print(f"⚠️  Cache server {self.host}:{self.port} unavailable: {e}")
+            return None
+
+    def get(self, key):
+        data = self._call('GET', key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return data
+
+    def set(self, key, data, ttl):
+        self._call('SET', key, data, 'PX', max(1, int(ttl * 1000)))
+
+    def delete(self, key):
+        self._call('DEL', key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {'server': f'{self.host}:{self.port}/{self.db}', 'hits': self.hits, 'misses': self.misses,
+                    'errors': self.errors, 'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                    'available': time.monotonic() >= self._down_until}
+
+
+BACKENDS = {cls.name: cls for cls in (MemoryBackend, DiskBackend, SharedMemoryBackend, RedisBackend)}
+
+
+def create_backend(name):
+    """Backend instance for a CACHE_BACKEND name, or None for 'none'"""
+    name = (name or 'none').strip().lower()
+    if name == 'none':
+        return None
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{name}', expected one of: none, {', '.join(BACKENDS)}")
+    try:
+        return BACKENDS[name]()
+    except OSError as e:
+        if name != 'shm':
+            raise
+        # A table that cannot be backed in full would SIGBUS the workers once /dev/shm filled up
+        print(f"⚠️  Shared-memory cache unavailable ({e}), using an in-process L2 instead")
+        return MemoryBackend()
+
+
+class NamespacedCache:
+    """Value cache over a bytes backend: prefixed keys, a default TTL, JSON + zlib values
+
+    Used as the L2 behind the in-process caches (ResponseCache, ArticleCache).
+    Each value carries its wall-clock expiry, so a reader can tell how long it
+    has left whichever backend holds it.
+    """
+    EXPIRY = struct.Struct('!d')
+
+    def __init__(self, namespace, backend, ttl):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl = ttl
+
+    def _key(self, key):
+        return f'{CACHE_PREFIX}:{self.namespace}:{key}'
+
+    def get(self, key):
+        found = self.get_with_ttl(key)
+        return found[0] if found is not None else None
+
+    def get_with_ttl(self, key):
+        """(value, seconds it has left) or None"""
+        data = self.backend.get(self._key(key))
+        if data is None:
+            return None
+        try:
+            expires_at = self.EXPIRY.unpack_from(data)[0]
+            value = decode(data[self.EXPIRY.size:])
+        except (struct.error, ValueError, zlib.error):
+            self.backend.delete(self._key(key))
+            return None
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+        return value, remaining
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self.backend.set(self._key(key), self.EXPIRY.pack(time.time() + ttl) + encode(value), ttl)
+
+    def delete(self, key):
+        self.backend.delete(self._key(key))
@@ -0,0 +1,203 @@
+import os
+import threading
+import time
+from collections import deque
+
+BREAKER_WINDOW_SECONDS = float(os.environ.get('BREAKER_WINDOW_SECONDS', 60))
+BREAKER_MIN_CALLS = int(os.environ.get('BREAKER_MIN_CALLS', 10))
+BREAKER_FAILURE_RATE = float(os.environ.get('BREAKER_FAILURE_RATE', 0.5))
+BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('BREAKER_SLOW_CALL_SECONDS', 15))
+BREAKER_OPEN_SECONDS = float(os.environ.get('BREAKER_OPEN_SECONDS', 30))
+BREAKER_HALF_OPEN_PROBES = int(os.environ.get('BREAKER_HALF_OPEN_PROBES', 1))
+BREAKER_PROBE_TIMEOUT_SECONDS = float(os.environ.get('BREAKER_PROBE_TIMEOUT_SECONDS', 60))
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class Probe:
+    """Token from acquire() marking a half-open probe call; only its outcome decides the circuit"""
+    __slots__ = ('started',)
+
+    def __init__(self, started):
+        self.started = started
+
+
+class CircuitBreaker:
+    """Tracks one provider's health and short-circuits calls while it is failing
+
+    Calls that raise, or that take longer than slow_call_seconds, count as
+    bad outcomes. Once at least min_calls outcomes in the sliding window are
+    bad at failure_rate or worse, the circuit opens for open_seconds, then
+    lets a few probe calls through (half-open) to decide whether to close.
+    A probe that neither succeeds nor fails (release(), or no report within
+    probe_timeout) frees its slot for another probe. acquire() returns a
+    Probe for probe calls, to be passed back with the outcome: while half-open,
+    outcomes of calls let through before the circuit opened are ignored.
+    """
+
+    def __init__(self, name, window_seconds=BREAKER_WINDOW_SECONDS, min_calls=BREAKER_MIN_CALLS,
+                 failure_rate=BREAKER_FAILURE_RATE, slow_call_seconds=BREAKER_SLOW_CALL_SECONDS,
+                 open_seconds=BREAKER_OPEN_SECONDS, half_open_probes=BREAKER_HALF_OPEN_PROBES,
+                 probe_timeout=BREAKER_PROBE_TIMEOUT_SECONDS):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self.probe_timeout = probe_timeout
+        self._state = CLOSED
+        self._opened_at = 0.0
+        # Half-open probes still awaiting an outcome, oldest first
+        self._probes = deque()
+        self._events = deque()
+        self._lock = threading.Lock()
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def _prune(self, now):
+        while self._events and self._events[0][0] < now - self.window_seconds:
+            self._events.popleft()
+
+    def _refresh_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes.clear()
+        while self._probes and now - self._probes[0].started >= self.probe_timeout:
+            self._probes.popleft()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            return self._state
+
+    def available(self):
+        """True if a call would currently be let through"""
+        with self._lock:
+            self._refresh_state(time.monotonic())
+            if self._state == CLOSED:
+                return True
+            return self._state == HALF_OPEN and len(self._probes) < self.half_open_probes
+
+    def acquire(self):
+        """Reserve permission for one call, raising CircuitOpenError if refused
+
+        Returns a Probe for a half-open probe call, else None; hand it back to
+        record_success, record_failure or release.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_state(now)
+            if self._state == CLOSED:
+                return None
+            if self._state == HALF_OPEN and len(self._probes) < self.half_open_probes:
+                probe = Probe(now)
+                self._probes.append(probe)
+                return probe
+            self.short_circuited += 1
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def release(self, probe=None):
+        """Give back a permission from acquire() whose call ended without an outcome
+
+        Used when the caller abandons the call (e.g. the client went away), which
+        says nothing about the provider's health.
+        """
+        with self._lock:
+            if probe in self._probes:
+                self._probes.remove(probe)
+
+    def record_success(self, latency, probe=None):
+        self._record(latency >= self.slow_call_seconds, latency, probe)
+
+    def record_failure(self, latency=0.0, probe=None):
+        self._record(True, latency, probe)
+
+    def record_timeout(self, latency, timeout, probe=None):
+        """Record a call that timed out after being given timeout seconds (None: no limit)
+
+        A timeout shorter than slow_call_seconds was cut short by the caller's
+        own deadline and says nothing about the provider, so it is released
+        rather than counted; otherwise one client sending tiny deadlines could
+        open the circuit for everyone.
+        """
+        if timeout is not None and timeout < self.slow_call_seconds:
+            self.release(probe)
+        else:
+            self.record_failure(latency, probe)
+
+    def _record(self, bad, latency, probe=None):
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_state(now)
+            if self._state == HALF_OPEN:
+                # Only a live probe speaks for the provider now; calls from before the trip
+                # (or probes that already timed out) report on a state that has moved on
+                if probe is None or probe not in self._probes:
+                    return
+                self._probes.remove(probe)
+                if bad:
+                    self._trip(now)
+                else:
+                    self._state = CLOSED
+                    self._events.clear()
+                return
+            self._events.append((now, bad, latency))
+            self._prune(now)
+            if self._state == CLOSED and len(self._events) >= self.min_calls:
+                bad_calls = sum(1 for _, b, _ in self._events if b)
+                if bad_calls / len(self._events) >= self.failure_rate:
+                    self._trip(now)
+
+    def _trip(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._events.clear()
+        self.times_opened += 1
+
+    def call(self, fn, timeout=None, timeout_errors=()):
+        """Run fn under the breaker, recording its outcome and latency
+
+        timeout is the limit fn runs under; errors in timeout_errors go to record_timeout.
+        """
+        probe = self.acquire()
+        start = time.monotonic()
+        try:
+            result = fn()
+        except timeout_errors:
+            self.record_timeout(time.monotonic() - start, timeout, probe)
+            raise
+        except Exception:
+            self.record_failure(time.monotonic() - start, probe)
+            raise
+        except BaseException:
+            self.release(probe)
+            raise
+        self.record_success(time.monotonic() - start, probe)
+        return result
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            self._refresh_state(now)
+            self._prune(now)
+            calls = len(self._events)
+            bad_calls = sum(1 for _, b, _ in self._events if b)
+            latencies = [l for _, b, l in self._events if not b]
+            return {
+                'state': self._state,
+                'window_calls': calls,
+                'window_failure_rate': (bad_calls / calls) if calls else 0.0,
+                'window_avg_latency': (sum(latencies) / len(latencies)) if latencies else None,
+                'open_for': max(0.0, self.open_seconds - (now - self._opened_at)) if self._state == OPEN else 0.0,
+                'times_opened': self.times_opened,
+                'short_circuited': self.short_circuited,
+            }
@@ -0,0 +1,79 @@
+import os
+import time
+
+REQUEST_DEADLINE_SECONDS = float(os.environ.get('REQUEST_DEADLINE_SECONDS', 30))
+MAX_REQUEST_DEADLINE_SECONDS = float(os.environ.get('MAX_REQUEST_DEADLINE_SECONDS', 120))
+MIN_CALL_TIMEOUT = 0.5
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+class RequestCancelled(Exception):
+    pass
+
+
+class Deadline:
+    """End-to-end time budget for one request
+
+    is_cancelled is an optional callable (e.g. a client-disconnect probe)
+    consulted by check(), so long waits can be abandoned early.
+    """
+
+    def __init__(self, seconds=None, is_cancelled=None):
+        self.expires_at = None if seconds is None else time.monotonic() + seconds
+        self.is_cancelled = is_cancelled
+        self.cancelled = False
+
+    @classmethod
+    def from_request(cls, requested=None, default=REQUEST_DEADLINE_SECONDS, is_cancelled=None):
+        """Deadline from a client-supplied value in seconds
+
+        Only the client's value is clamped: to the server maximum, or to the
+        route's own default where that is larger (e.g. batches).
+        """
+        try:
+            seconds = float(requested) if requested not in (None, '') else None
+        except (TypeError, ValueError):
+            seconds = None
+        if seconds is None or seconds <= 0:
+            return cls(default, is_cancelled)
+        return cls(min(seconds, max(MAX_REQUEST_DEADLINE_SECONDS, default)), is_cancelled)
+
+    def child(self, share=1.0):
+        """Deadline for one stage: a share of the budget remaining now, fixed from here on
+
+        Later stages keep their part of the budget however the stage spends its own.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return Deadline(None, self.is_cancelled)
+        return Deadline(min(remaining, max(MIN_CALL_TIMEOUT, remaining * share)), self.is_cancelled)
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def check(self):
+        """Raise if the deadline has passed or the request was cancelled"""
+        if not self.cancelled and self.is_cancelled is not None and self.is_cancelled():
+            self.cancelled = True
+        if self.cancelled:
+            raise RequestCancelled("Client disconnected")
+        if self.expires_at is not None and time.monotonic() >= self.expires_at:
+            raise DeadlineExceeded("Request deadline exceeded")
+
+    def timeout(self, share=1.0, cap=None):
+        """Socket timeout for the next call: a share of the remaining budget"""
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        budget = max(MIN_CALL_TIMEOUT, remaining * share)
+        budget = min(budget, remaining)
+        return budget if cap is None else min(budget, cap)
+
+
+NO_DEADLINE = Deadline()
@@ -0,0 +1,250 @@
+import os
+import pickle
+import queue
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+from extractors import ExtractionEngine, ExtractionError, EXTRACTOR_BACKENDS
+
+# Every pre-forked server process (WEB_WORKERS) starts its own pool, so by default they split the CPUs
+WEB_WORKERS = max(1, int(os.environ.get('WEB_WORKERS', 1)))
+EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+EXTRACTION_MAX_TASKS = int(os.environ.get('EXTRACTION_MAX_TASKS', 200))
+EXTRACTION_MAX_RSS_MB = float(os.environ.get('EXTRACTION_MAX_RSS_MB', 300))
+EXTRACTION_TASK_TIMEOUT = float(os.environ.get('EXTRACTION_TASK_TIMEOUT', 5))
+
+HEADER = struct.Struct('!I')
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+class WorkerCrashed(ExtractionError):
+    pass
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _write_message(stream, obj):
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def _read_exact(stream, size):
+    data = b''
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+class _Worker:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        self.tasks = 0
+        self.rss_mb = 0.0
+
+    def _recv(self, timeout):
+        fd = self.proc.stdout.fileno()
+        end = time.monotonic() + timeout
+        buffer = b''
+        needed = HEADER.size
+        length = None
+        while len(buffer) < needed:
+            left = end - time.monotonic()
+            if left <= 0:
+                raise ExtractionTimeout(f"Extraction took longer than {timeout:.2f}s")
+            readable, _, _ = select.select([fd], [], [], left)
+            if not readable:
+                continue
+            chunk = os.read(fd, max(65536, needed - len(buffer)))
+            if not chunk:
+                raise WorkerCrashed(f"Extraction worker exited with {self.proc.poll()}")
+            buffer += chunk
+            if length is None and len(buffer) >= HEADER.size:
+                length = HEADER.unpack(buffer[:HEADER.size])[0]
+                needed = HEADER.size + length
+        return pickle.loads(buffer[HEADER.size:needed])
+
+    def call(self, message, timeout):
+        try:
+            _write_message(self.proc.stdin, message)
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(f"Extraction worker unavailable: {e}")
+        status, payload, rss_mb = self._recv(timeout)
+        self.tasks += 1
+        self.rss_mb = rss_mb
+        return status, payload
+
+    def stop(self, kill=False):
+        """Terminate (or kill) the worker process and wait for it to exit"""
+        try:
+            if kill:
+                self.proc.kill()
+            else:
+                self.proc.terminate()
+            self.proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.proc.kill()
+            self.proc.wait()
+        for pipe in (self.proc.stdin, self.proc.stdout):
+            try:
+                pipe.close()
+            except OSError:
+                pass
+
+
+class ExtractionPool:
+    """Fixed-size pool of extraction worker processes, started lazily
+
+    Workers are separate interpreters launched with subprocess rather than
+    forked from the threaded server, and talk length-prefixed pickles over
+    stdin/stdout. A worker is replaced after max_tasks tasks, once its RSS
+    passes max_rss_mb, when a task overruns its time limit, or if it dies.
+    """
+
+    def __init__(self, backends=EXTRACTOR_BACKENDS, size=EXTRACTION_WORKERS, max_tasks=EXTRACTION_MAX_TASKS,
+                 max_rss_mb=EXTRACTION_MAX_RSS_MB, task_timeout=EXTRACTION_TASK_TIMEOUT):
+        self.backends = tuple(backends)
+        self.size = size
+        self.max_tasks = max_tasks
+        self.max_rss_mb = max_rss_mb
+        self.task_timeout = task_timeout
+        self._idle = queue.Queue()
+        # Every live worker, idle or busy, so close() can stop them all
+        self._workers = set()
+        self._started = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self.tasks = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def _start(self):
+        with self._lock:
+            if self._closed:
+                raise ExtractionError("Extraction pool is closed")
+            if not self._started:
+                for _ in range(self.size):
+                    worker = _Worker()
+                    self._workers.add(worker)
+                    self._idle.put(worker)
+                self._started = True
+
+    def extract(self, html, url=None, timeout=None):
+        """ExtractionEngine.extract(html, url) run in a worker, within the task time limit"""
+        self._start()
+        timeout = self.task_timeout if timeout is None else min(timeout, self.task_timeout)
+        end = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=max(0.0, timeout))
+        except queue.Empty:
+            raise ExtractionTimeout("No extraction worker became free in time")
+        replace = False
+        try:
+            status, payload = worker.call((self.backends, html, url), max(0.0, end - time.monotonic()))
+            if worker.tasks >= self.max_tasks or worker.rss_mb >= self.max_rss_mb:
+                replace = True
+                with self._lock:
+                    self.recycled += 1
+        except ExtractionTimeout:
+            replace = True
+            with self._lock:
+                self.timeouts += 1
+            raise
+        except WorkerCrashed:
+            replace = True
+            with self._lock:
+                self.crashes += 1
+            raise
+        finally:
+            if replace:
+                worker.stop(kill=True)
+            with self._lock:
+                self.tasks += 1
+                if replace:
+                    self._workers.discard(worker)
+                    worker = None if self._closed else _Worker()
+                    if worker is not None:
+                        self._workers.add(worker)
+                elif self._closed:
+                    # close() has already stopped it
+                    worker = None
+                if worker is not None:
+                    self._idle.put(worker)
+        if status != 'ok':
+            raise ExtractionError(payload)
+        return payload
+
+    def close(self):
+        """Stop every worker, including those busy with a task (which then fails)"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.size if self._started else 0,
+                'idle': self._idle.qsize(),
+                'tasks': self.tasks,
+                'timeouts': self.timeouts,
+                'crashes': self.crashes,
+                'recycled': self.recycled,
+            }
+
+
+def worker_main():
+    """Worker process loop: read (backends, html, url), reply (status, result, rss_mb)"""
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    # Anything the extractors print must not corrupt the result channel
+    sys.stdout = sys.stderr
+    engines = {}
+    while True:
+        header = _read_exact(stdin, HEADER.size)
+        if header is None:
+            return
+        backends, html, url = pickle.loads(_read_exact(stdin, HEADER.unpack(header)[0]))
+        try:
+            if backends not in engines:
+                engines[backends] = ExtractionEngine(backends)
+            reply = ('ok', engines[backends].extract(html, url))
+        except Exception as e:
+            reply = ('error', f"{type(e).__name__}: {e}")
+        _write_message(stdout, reply + (current_rss_mb(),))
+
+
+if __name__ == "__main__":
+    worker_main()
@@ -0,0 +1,176 @@
+import importlib.util
+import os
+import re
+
+import lxml.html
+from lxml import etree
+
+from article_fetcher import TextCollector
+
+EXTRACTOR_BACKENDS = [name.strip() for name in os.environ.get('EXTRACTOR_BACKENDS', 'lxml,newspaper').split(',') if name.strip()]
+EXTRACTOR_MIN_CHARS = int(os.environ.get('EXTRACTOR_MIN_CHARS', 300))
+
+DROP_TAGS = ['script', 'style', 'noscript', 'nav', 'header', 'footer', 'aside', 'form', 'iframe', 'svg', 'template', 'button', 'select']
+BLOCK_TAGS = {'p', 'h2', 'h3', 'h4', 'li', 'blockquote', 'pre'}
+NEGATIVE = re.compile(r'comment|meta|footer|footnote|sidebar|sponsor|share|social|promo|related|advert|\bads?\b|banner|'
+                      r'nav|menu|breadcrumb|cookie|consent|subscribe|newsletter|signup|popup|modal|widget|tags|byline|author-bio', re.I)
+POSITIVE = re.compile(r'article|body|content|entry|main|page|post|story|text|blog', re.I)
+
+
+def _clean(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class LxmlExtractor:
+    """Readability-style extractor: scores containers by the paragraph text they hold"""
+    name = 'lxml'
+
+    def available(self):
+        return True
+
+    def _class_weight(self, element):
+        weight = 0
+        for attr in (element.get('class'), element.get('id')):
+            if attr:
+                if NEGATIVE.search(attr):
+                    weight -= 25
+                if POSITIVE.search(attr):
+                    weight += 25
+        return weight
+
+    def _link_density(self, element, text_length):
+        if not text_length:
+            return 1.0
+        link_length = sum(len(_clean(a.text_content())) for a in element.iter('a'))
+        return min(1.0, link_length / text_length)
+
+    def extract(self, html, url=None):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        if not html.strip():
+            raise ExtractionError('Empty document')
+        try:
+            doc = lxml.html.fromstring(html)
+        except (etree.ParserError, ValueError) as e:
+            raise ExtractionError(str(e))
+
+        title = ''
+        og_title = doc.find('.//meta[@property="og:title"]')
+        if og_title is not None and og_title.get('content'):
+            title = _clean(og_title.get('content'))
+        elif doc.find('.//title') is not None:
+            title = _clean(doc.find('.//title').text_content())
+
+        etree.strip_elements(doc, *DROP_TAGS, with_tail=False)
+        for element in list(doc.iter(etree.Element)):
+            if element.getparent() is None or element.tag in ('html', 'body'):
+                continue
+            attrs = ' '.join(filter(None, (element.get('class'), element.get('id'))))
+            if attrs and NEGATIVE.search(attrs) and not POSITIVE.search(attrs):
+                element.drop_tree()
+
+        scores = {}
+        for paragraph in doc.iter('p', 'pre', 'blockquote'):
+            text = _clean(paragraph.text_content())
+            if len(text) < 25:
+                continue
+            score = 1 + text.count(',') + min(len(text) // 100, 3)
+            parent = paragraph.getparent()
+            for ancestor, share in ((parent, 1.0), (parent.getparent() if parent is not None else None, 0.5)):
+                if ancestor is None:
+                    continue
+                if ancestor not in scores:
+                    scores[ancestor] = self._class_weight(ancestor) + (5 if ancestor.tag in ('article', 'main') else 0)
+                scores[ancestor] += score * share
+
+        best, best_score = None, 0
+        for candidate, score in scores.items():
+            text_length = len(_clean(candidate.text_content()))
+            score *= 1 - self._link_density(candidate, text_length)
+            if score > best_score:
+                best, best_score = candidate, score
+        if best is None:
+            best = doc
+
+        blocks = []
+        for element in best.iter(*BLOCK_TAGS):
+            if element.tag == 'li' and element.find('.//p') is not None:
+                continue
+            text = _clean(element.text_content())
+            if len(text) >= 25 and self._link_density(element, len(text)) < 0.5:
+                blocks.append(text)
+        return {'title': title, 'content': '\n'.join(blocks)}
+
+
+class StreamExtractor:
+    """The incremental paragraph collector used while fetching, run over a whole page"""
+    name = 'stream'
+
+    def available(self):
+        return True
+
+    def extract(self, html, url=None):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        collector = TextCollector()
+        collector.feed(html)
+        collector.close()
+        return {'title': collector.og_title or collector.title, 'content': collector.text}
+
+
+class NewspaperExtractor:
+    """newspaper3k, kept as an optional fallback backend"""
+    name = 'newspaper'
+
+    def available(self):
+        # find_spec only locates the package; the slow newspaper import waits for the first extract()
+        return importlib.util.find_spec('newspaper') is not None
+
+    def extract(self, html, url=None):
+        try:
+            import newspaper
+        except ImportError as e:
+            raise ExtractionError(f'newspaper3k unavailable: {e}')
+        if isinstance(html, bytes):
+            html = html.decode('utf-8', errors='replace')
+        article = newspaper.Article(url or 'http://localhost/')
+        article.download(input_html=html)
+        article.parse()
+        return {'title': (article.title or '').strip(), 'content': article.text.strip()}
+
+
+BACKENDS = {cls.name: cls for cls in (LxmlExtractor, StreamExtractor, NewspaperExtractor)}
+
+
+class ExtractionEngine:
+    """Tries extraction backends in order until one yields enough text"""
+
+    def __init__(self, backends=EXTRACTOR_BACKENDS, min_chars=EXTRACTOR_MIN_CHARS):
+        self.backends = [BACKENDS[name]() for name in backends if name in BACKENDS]
+        self.backends = [backend for backend in self.backends if backend.available()]
+        self.min_chars = min_chars
+
+    def extract(self, html, url=None):
+        """Return {'title', 'content', 'backend'} from the first backend with min_chars of text
+
+        If none reaches min_chars, the longest result is returned.
+        """
+        best = None
+        for backend in self.backends:
+            try:
+                result = backend.extract(html, url)
+            except Exception as e:
+                print(f"⚠️  {backend.name} extractor failed: {e}")
+                continue
+            result['backend'] = backend.name
+            if len(result['content']) >= self.min_chars:
+                return result
+            if best is None or len(result['content']) > len(best['content']):
+                best = result
+        if best is None:
+            raise ExtractionError('No extractor could parse the page')
+        return best
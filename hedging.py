@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import wait, FIRST_COMPLETED
+
+HEDGING_ENABLED = os.environ.get('HEDGING_ENABLED', 'true').lower() == 'true'
+HEDGE_PERCENTILE = float(os.environ.get('HEDGE_PERCENTILE', 95))
+HEDGE_MIN_DELAY = float(os.environ.get('HEDGE_MIN_DELAY', 1.0))
+HEDGE_DEFAULT_DELAY = float(os.environ.get('HEDGE_DEFAULT_DELAY', 4.0))
+HEDGE_MAX_RATIO = float(os.environ.get('HEDGE_MAX_RATIO', 0.1))
+HEDGE_BURST = float(os.environ.get('HEDGE_BURST', 5))
+LATENCY_WINDOW = int(os.environ.get('HEDGE_LATENCY_WINDOW', 200))
+MIN_SAMPLES = 20
+POLL_INTERVAL = 0.25
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies for one provider"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        with self._lock:
+            if len(self._samples) < MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class Hedger:
+    """Runs a primary provider call and races a fallback once it gets slow
+
+    The fallback is fired when the primary is still running after its
+    HEDGE_PERCENTILE latency, or immediately after the primary fails.
+    Hedges are paid for out of a credit that grows by HEDGE_MAX_RATIO per
+    request, so hedging never adds more than that fraction of extra calls.
+    """
+
+    def __init__(self, executor, enabled=HEDGING_ENABLED, percentile=HEDGE_PERCENTILE,
+                 min_delay=HEDGE_MIN_DELAY, default_delay=HEDGE_DEFAULT_DELAY,
+                 max_ratio=HEDGE_MAX_RATIO, burst=HEDGE_BURST):
+        self.executor = executor
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.default_delay = default_delay
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.trackers = {}
+        self._lock = threading.Lock()
+        self._credit = 0.0
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def tracker(self, name):
+        with self._lock:
+            if name not in self.trackers:
+                self.trackers[name] = LatencyTracker()
+            return self.trackers[name]
+
+    def hedge_delay(self, name):
+        observed = self.tracker(name).percentile(self.percentile)
+        if observed is None:
+            return self.default_delay
+        return max(self.min_delay, observed)
+
+    def _take_credit(self):
+        with self._lock:
+            if self._credit >= 1.0:
+                self._credit -= 1.0
+                self.hedged += 1
+                return True
+            return False
+
+    def _timed(self, name, fn):
+        start = time.monotonic()
+        result = fn()
+        self.tracker(name).record(time.monotonic() - start)
+        return result
+
+    def _wait(self, futures, timeout, deadline):
+        """wait() that wakes up regularly to honour the request deadline"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if deadline is not None:
+                deadline.check()
+            step = POLL_INTERVAL if end is None else min(POLL_INTERVAL, max(0.0, end - time.monotonic()))
+            done, pending = wait(futures, timeout=step, return_when=FIRST_COMPLETED)
+            if done or (end is not None and time.monotonic() >= end):
+                return done, pending
+
+    def run(self, primary_name, primary_fn, fallback_name, fallback_fn, deadline=None):
+        """Return the first successful result of primary_fn/fallback_fn
+
+        With a deadline, waiting stops as soon as it expires or is cancelled;
+        calls still running are abandoned to their own socket timeouts.
+        """
+        with self._lock:
+            self.requests += 1
+            self._credit = min(self.burst, self._credit + self.max_ratio)
+
+        if not self.enabled:
+            try:
+                return self._timed(primary_name, primary_fn)
+            except Exception as e:
+                print(f"Primary model failed, trying fallback: {e}")
+                if deadline is not None:
+                    deadline.check()
+                with self._lock:
+                    self.fallbacks += 1
+                return self._timed(fallback_name, fallback_fn)
+
+        primary = self.executor.submit(self._timed, primary_name, primary_fn)
+        names = {primary: primary_name}
+        done, _ = self._wait([primary], self.hedge_delay(primary_name), deadline)
+        hedged = False
+        if not done and self._take_credit():
+            hedged = True
+            names[self.executor.submit(self._timed, fallback_name, fallback_fn)] = fallback_name
+
+        pending = set(names)
+        error = None
+        while pending:
+            done, pending = self._wait(pending, None, deadline)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    if len(names) == 1:
+                        if deadline is not None:
+                            deadline.check()
+                        print(f"Primary model failed, trying fallback: {e}")
+                        with self._lock:
+                            self.fallbacks += 1
+                        fallback = self.executor.submit(self._timed, fallback_name, fallback_fn)
+                        names[fallback] = fallback_name
+                        pending.add(fallback)
+                    continue
+                # The slower call keeps running in its worker; its result is ignored
+                if hedged and names[future] == fallback_name:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return result
+        raise error
+
+    def stats(self):
+        with self._lock:
+            requests, hedged, wins, fallbacks = self.requests, self.hedged, self.hedge_wins, self.fallbacks
+            names = list(self.trackers)
+        return {
+            'enabled': self.enabled,
+            'requests': requests,
+            'hedged': hedged,
+            'hedge_wins': wins,
+            'fallbacks': fallbacks,
+            'hedge_rate': (hedged / requests) if requests else 0.0,
+            'win_rate': (wins / hedged) if hedged else 0.0,
+            'hedge_delay': {name: self.hedge_delay(name) for name in names},
+        }
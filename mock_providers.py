@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Gemini and OpenRouter APIs, for load testing server.py without quota
+
+Emulates Gemini generateContent / streamGenerateContent (alt=sse) and OpenRouter
+chat completions (plain and "stream": true). Every response waits for a latency
+drawn from --latency; streams then send the post a few words at a time.
+--error-rate answers a fraction of calls with one of --error-codes (429s carry
+Retry-After), and --hang-rate holds a fraction open for --hang-seconds so
+deadlines and hedging can be exercised. GET /stats returns call counts.
+
+Latency specs (seconds): fixed:0.5, uniform:0.2,1.5, normal:0.8,0.2,
+lognormal:0.8,0.5 (median, sigma), exp:0.8 (mean).
+
+Usage: python mock_providers.py [--port 8090] [--latency lognormal:0.8,0.5] [--error-rate 0.02]
+Then:  GEMINI_MODEL_URL=http://127.0.0.1:8090/v1beta/models/gemini-1.5-flash \\
+       OPENROUTER_CHAT_URL=http://127.0.0.1:8090/api/v1/chat/completions python server.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SENTENCES = [
+    "Most teams underestimate how much small process changes compound over a year.",
+    "The best results I have seen came from shipping early and listening closely.",
+    "Data tells you what happened, but conversations tell you why.",
+    "Clear ownership beats clever tooling almost every time.",
+    "Consistency is the quiet advantage that competitors rarely copy.",
+    "Every hard problem gets easier once it is written down plainly.",
+    "Invest in the people who make the work visible.",
+    "Speed matters, but direction matters more.",
+]
+HASHTAGS = ['#Leadership', '#Innovation', '#Growth', '#Tech', '#Strategy', '#Careers']
+ERROR_STATUS = {400: 'INVALID_ARGUMENT', 429: 'RESOURCE_EXHAUSTED', 500: 'INTERNAL', 503: 'UNAVAILABLE'}
+
+
+def parse_latency(spec):
+    """Sampler returning seconds for a latency spec like 'lognormal:0.8,0.5'"""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v.strip()]
+    samplers = {
+        'fixed': lambda rng: values[0],
+        'uniform': lambda rng: rng.uniform(values[0], values[1]),
+        'normal': lambda rng: rng.gauss(values[0], values[1]),
+        'lognormal': lambda rng: values[0] * rng.lognormvariate(0, values[1]),
+        'exp': lambda rng: rng.expovariate(1 / values[0]),
+    }
+    if kind not in samplers:
+        raise argparse.ArgumentTypeError(f"unknown latency distribution '{kind}', expected one of: {', '.join(samplers)}")
+    needed = {'fixed': 1, 'exp': 1}.get(kind, 2)
+    if len(values) != needed:
+        raise argparse.ArgumentTypeError(f"'{kind}' takes {needed} value(s), got '{args}'")
+    return lambda rng: max(0.0, samplers[kind](rng))
+
+
+class MockProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/stats':
+            self.send_json(200, self.server.stats())
+        else:
+            self.send_json(404, {'error': {'code': 404, 'message': 'Not found'}})
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': {'code': 400, 'message': 'Invalid JSON payload'}})
+            return
+
+        if parts.path.endswith(':generateContent'):
+            route, stream = 'gemini', False
+        elif parts.path.endswith(':streamGenerateContent'):
+            route, stream = 'gemini', True
+        elif parts.path.endswith('/chat/completions'):
+            route, stream = 'openrouter', bool(body.get('stream'))
+            if not (self.headers.get('Authorization') or '').startswith('Bearer '):
+                self.fail(route, 401)
+                return
+        else:
+            self.send_json(404, {'error': {'code': 404, 'message': f'No such endpoint: {parts.path}'}})
+            return
+        if route == 'gemini' and not self.headers.get('x-goog-api-key'):
+            self.fail(route, 400)
+            return
+
+        outcome = self.server.draw()
+        if outcome == 'hang':
+            time.sleep(self.server.hang_seconds)
+        elif outcome is not None:
+            self.fail(route, outcome)
+            return
+
+        time.sleep(self.server.sample_latency())
+        text = self.server.make_post()
+        if not stream:
+            self.server.count(route, 200)
+            if route == 'gemini':
+                self.send_json(200, {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'},
+                                                     'finishReason': 'STOP'}]})
+            else:
+                self.send_json(200, {'id': 'mock-chat', 'object': 'chat.completion', 'model': body.get('model'),
+                                     'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                                                  'finish_reason': 'stop'}]})
+            return
+
+        self.server.count(route + '_stream', 200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for piece in self.server.pieces(text):
+                if route == 'gemini':
+                    event = {'candidates': [{'content': {'parts': [{'text': piece}], 'role': 'model'}}]}
+                else:
+                    event = {'id': 'mock-chat', 'object': 'chat.completion.chunk',
+                             'choices': [{'index': 0, 'delta': {'content': piece}}]}
+                self.write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n".encode('utf-8'))
+                time.sleep(self.server.chunk_delay)
+            if route == 'openrouter':
+                self.write_chunk(b"data: [DONE]\r\n\r\n")
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def write_chunk(self, data):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+    def fail(self, route, status):
+        self.server.count(route, status)
+        headers = {'Retry-After': str(self.server.retry_after)} if status == 429 else {}
+        self.send_json(status, {'error': {'code': status, 'message': f'Mock provider error {status}',
+                                          'status': ERROR_STATUS.get(status, 'UNKNOWN')}}, headers)
+
+    def send_json(self, status, payload, headers=None):
+        # Raw UTF-8 like the real APIs, so clients that guess the charset get caught
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockProviderServer(ThreadingHTTPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, address, latency, error_rate=0.0, error_codes=(429, 500, 503), hang_rate=0.0,
+                 hang_seconds=30.0, retry_after=1, words=80, chunk_words=4, chunk_delay=0.02, seed=None, verbose=False):
+        super().__init__(address, MockProviderHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_codes = list(error_codes)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+        self.words = words
+        self.chunk_words = max(1, chunk_words)
+        self.chunk_delay = chunk_delay
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = Counter()
+
+    def draw(self):
+        """None for a normal answer, 'hang', or an error status"""
+        with self.lock:
+            roll = self.rng.random()
+            if roll < self.hang_rate:
+                return 'hang'
+            if roll < self.hang_rate + self.error_rate:
+                return self.rng.choice(self.error_codes)
+        return None
+
+    def sample_latency(self):
+        with self.lock:
+            return self.latency(self.rng)
+
+    def make_post(self):
+        with self.lock:
+            words = []
+            while len(words) < self.words:
+                words.extend(self.rng.choice(SENTENCES).split())
+            tags = self.rng.sample(HASHTAGS, 3)
+        return ' '.join(words[:self.words]).rstrip('.,') + '. 🚀💡\n' + ' '.join(tags)
+
+    def pieces(self, text):
+        words = text.split(' ')
+        for i in range(0, len(words), self.chunk_words):
+            yield ' '.join(words[i:i + self.chunk_words]) + (' ' if i + self.chunk_words < len(words) else '')
+
+    def count(self, route, status):
+        with self.lock:
+            self.calls[(route, status)] += 1
+
+    def stats(self):
+        with self.lock:
+            return {f'{route} {status}': n for (route, status), n in sorted(self.calls.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=parse_latency, default='lognormal:0.8,0.5',
+                        help='time to the answer or first streamed token')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of calls answered with an error')
+    parser.add_argument('--error-codes', default='429,500,503', help='comma-separated statuses to pick errors from')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='fraction of calls held open before answering')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--words', type=int, default=80, help='words per generated post')
+    parser.add_argument('--chunk-words', type=int, default=4, help='words per streamed event')
+    parser.add_argument('--chunk-delay', type=float, default=0.02, help='seconds between streamed events')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    error_codes = [int(code) for code in args.error_codes.split(',') if code.strip()]
+    with MockProviderServer((args.host, args.port), args.latency, args.error_rate, error_codes, args.hang_rate,
+                            args.hang_seconds, args.retry_after, args.words, args.chunk_words, args.chunk_delay,
+                            args.seed, args.verbose) as server:
+        base = f'http://{args.host}:{args.port}'
+        print(f"🧪 Mock providers listening on {base}")
+        print(f"   GEMINI_MODEL_URL={base}/v1beta/models/gemini-1.5-flash")
+        print(f"   OPENROUTER_CHAT_URL={base}/api/v1/chat/completions")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Mock providers stopped")
+
+
+if __name__ == "__main__":
+    main()
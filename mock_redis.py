@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a Redis cache server, for trying CACHE_BACKEND=redis without Redis
+
+Speaks enough of the RESP protocol for the cache client: PING, GET, SET (EX/PX/NX/XX),
+DEL, EXISTS, EXPIRE, PEXPIRE, TTL, PTTL, DBSIZE, FLUSHDB/FLUSHALL, SELECT, AUTH, QUIT.
+Everything lives in memory and is lost on exit.
+
+Usage: python mock_redis.py [--host 127.0.0.1] [--port 6379]
+Then:  CACHE_BACKEND=redis CACHE_URL=redis://127.0.0.1:6379/0 python server.py
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+
+
+class Store:
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self.data.get(key)
+        if item is not None and item[1] is not None and item[1] <= now:
+            del self.data[key]
+            return None
+        return item
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, value):
+        if value is None:
+            out = b'$-1\r\n'
+        elif isinstance(value, int):
+            out = b':%d\r\n' % value
+        elif isinstance(value, bytes):
+            out = b'$%d\r\n%s\r\n' % (len(value), value)
+        elif isinstance(value, Exception):
+            out = f'-ERR {value}\r\n'.encode()
+        else:
+            out = f'+{value}\r\n'.encode()
+        self.wfile.write(out)
+
+    def handle(self):
+        while True:
+            try:
+                args = self.read_command()
+            except (ValueError, OSError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            name = args[0].decode().upper()
+            try:
+                result = self.execute(name, args[1:])
+            except Exception as e:
+                result = e
+            self.reply(result)
+            if name == 'QUIT':
+                return
+
+    def execute(self, name, args):
+        store = self.server.store
+        now = time.monotonic()
+        with store.lock:
+            if name == 'PING':
+                return args[0] if args else 'PONG'
+            if name in ('SELECT', 'AUTH', 'QUIT'):
+                return 'OK'
+            if name == 'GET':
+                item = store._live(args[0], now)
+                return item[0] if item else None
+            if name == 'SET':
+                key, value, options = args[0], args[1], [a.decode().upper() for a in args[2:]]
+                expires = None
+                for i, option in enumerate(options):
+                    if option == 'EX':
+                        expires = now + float(options[i + 1])
+                    elif option == 'PX':
+                        expires = now + float(options[i + 1]) / 1000
+                exists = store._live(key, now) is not None
+                if ('NX' in options and exists) or ('XX' in options and not exists):
+                    return None
+                store.data[key] = (value, expires)
+                return 'OK'
+            if name in ('DEL', 'EXISTS'):
+                found = [key for key in args if store._live(key, now) is not None]
+                if name == 'DEL':
+                    for key in found:
+                        del store.data[key]
+                return len(found)
+            if name in ('EXPIRE', 'PEXPIRE'):
+                item = store._live(args[0], now)
+                if item is None:
+                    return 0
+                seconds = float(args[1]) / (1000 if name == 'PEXPIRE' else 1)
+                store.data[args[0]] = (item[0], now + seconds)
+                return 1
+            if name in ('TTL', 'PTTL'):
+                item = store._live(args[0], now)
+                if item is None:
+                    return -2
+                if item[1] is None:
+                    return -1
+                return int((item[1] - now) * (1000 if name == 'PTTL' else 1))
+            if name == 'DBSIZE':
+                return len(store.data)
+            if name in ('FLUSHDB', 'FLUSHALL'):
+                store.data.clear()
+                return 'OK'
+        raise ValueError(f"unknown command '{name}'")
+
+
+class RespServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, RespHandler)
+        self.store = Store()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+    with RespServer((args.host, args.port)) as server:
+        print(f"🧪 Mock Redis listening on {args.host}:{args.port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Mock Redis stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import os
+import random
+import signal
+import socket
+import time
+
+PREFORK_SHUTDOWN_GRACE = float(os.environ.get('PREFORK_SHUTDOWN_GRACE', 10))
+PREFORK_MIN_UPTIME = float(os.environ.get('PREFORK_MIN_UPTIME', 5))
+PREFORK_MAX_RESTART_DELAY = float(os.environ.get('PREFORK_MAX_RESTART_DELAY', 30))
+POLL_INTERVAL = 0.5
+
+
+def reuse_port_supported():
+    return hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')
+
+
+class Supervisor:
+    """Pre-forks `workers` processes running target(index) and keeps them alive
+
+    A worker that exits is restarted; one that dies within PREFORK_MIN_UPTIME
+    of starting is restarted with exponential backoff so a crash loop cannot
+    spin. SIGTERM/SIGINT are forwarded to the workers as SIGTERM, and any still
+    running after PREFORK_SHUTDOWN_GRACE seconds are killed.
+    """
+
+    def __init__(self, workers, target, after_fork=None, grace=PREFORK_SHUTDOWN_GRACE):
+        self.workers = workers
+        self.target = target
+        self.after_fork = after_fork
+        self.grace = grace
+        self.children = {}
+        self.stopping = False
+        self.restarts = 0
+
+    def spawn(self, index):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                # Forked children share the parent's PRNG state; retry jitter must differ per worker
+                random.seed()
+                if self.after_fork is not None:
+                    self.after_fork()
+                self.target(index)
+            except KeyboardInterrupt:
+                pass
+            except BaseException as e:
+                print(f"❌ Worker {index} crashed: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = (index, time.monotonic())
+        return pid
+
+    def stop(self, signum=None, frame=None):
+        self.stopping = True
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(self.workers):
+            self.spawn(index)
+        print(f"👷 Supervisor {os.getpid()} started {self.workers} workers")
+
+        failures = {}
+        pending = {}
+        while not self.stopping:
+            self._reap(failures, pending)
+            now = time.monotonic()
+            for index, restart_at in list(pending.items()):
+                if now >= restart_at:
+                    del pending[index]
+                    self.restarts += 1
+                    print(f"🔁 Restarting worker {index}")
+                    self.spawn(index)
+            time.sleep(POLL_INTERVAL)
+        self.shutdown()
+
+    def _reap(self, failures, pending):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            index, started = self.children.pop(pid, (None, 0))
+            if index is None:
+                continue
+            uptime = time.monotonic() - started
+            print(f"⚠️  Worker {index} (pid {pid}) exited with status {os.waitstatus_to_exitcode(status)} after {uptime:.1f}s")
+            failures[index] = failures.get(index, 0) + 1 if uptime < PREFORK_MIN_UPTIME else 0
+            delay = min(PREFORK_MAX_RESTART_DELAY, 0.5 * (2 ** failures[index])) if failures[index] else 0
+            pending[index] = time.monotonic() + delay
+
+    def shutdown(self):
+        print(f"🛑 Stopping {len(self.children)} workers")
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        end = time.monotonic() + self.grace
+        while self.children and time.monotonic() < end:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in list(self.children):
+            print(f"⚠️  Worker pid {pid} did not stop in {self.grace:.0f}s, killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.children.clear()
@@ -0,0 +1,93 @@
+import os
+import threading
+from http.cookiejar import DefaultCookiePolicy
+import requests
+from requests.adapters import HTTPAdapter
+
+# Pool sizing: connections are kept per host, so one pool each for Gemini and OpenRouter
+POOL_CONNECTIONS = int(os.environ.get('HTTP_POOL_CONNECTIONS', 10))
+POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 32))
+POOL_BLOCK = os.environ.get('HTTP_POOL_BLOCK', 'false').lower() == 'true'
+CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 5))
+READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 60))
+# Article hosts get their own pools so they never evict the provider connections
+ARTICLE_POOL_CONNECTIONS = int(os.environ.get('ARTICLE_POOL_CONNECTIONS', 32))
+ARTICLE_POOL_MAXSIZE = int(os.environ.get('ARTICLE_POOL_MAXSIZE', 4))
+
+_session = None
+_article_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=POOL_BLOCK):
+    """Build a keep-alive requests.Session with sized connection pools"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def create_article_session(pool_connections=ARTICLE_POOL_CONNECTIONS, pool_maxsize=ARTICLE_POOL_MAXSIZE):
+    """Session for untrusted article URLs: separate pools and no cookie jar
+
+    Cookies set by one article site must not be kept, grow without bound, or
+    be replayed on fetches made for other users.
+    """
+    session = create_session(pool_connections, pool_maxsize, pool_block=False)
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return session
+
+
+def get_article_session():
+    """Return the process-wide article-fetching session, creating it on first use"""
+    global _article_session
+    if _article_session is None:
+        with _session_lock:
+            if _article_session is None:
+                _article_session = create_article_session()
+    return _article_session
+
+
+def reset_session():
+    """Drop the shared sessions so the next call opens fresh pools"""
+    global _session, _article_session
+    with _session_lock:
+        old = [_session, _article_session]
+        _session = _article_session = None
+    for session in old:
+        if session is not None:
+            session.close()
+
+
+def _with_timeout(kwargs):
+    # Never wait on a socket forever; timeout=None from a caller means "use the default"
+    if kwargs.get('timeout') is None:
+        kwargs['timeout'] = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    return kwargs
+
+
+def post(url, **kwargs):
+    """POST through the shared session"""
+    return get_session().post(url, **_with_timeout(kwargs))
+
+
+def get(url, **kwargs):
+    """GET through the shared session"""
+    return get_session().get(url, **_with_timeout(kwargs))
+
+
+def get_article(url, **kwargs):
+    """GET an article URL through the cookie-less article session"""
+    return get_article_session().get(url, **_with_timeout(kwargs))
@@ -0,0 +1,165 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_INDUSTRY = 'technology'
+DEFAULT_TONE = 'professional'
+DEFAULT_MODEL = 'gemini'
+DEFAULT_WORD_COUNT = 80
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 2048))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL', 3600))
+
+
+def _norm_text(value):
+    return re.sub(r'\s+', ' ', str(value or '')).strip().lower()
+
+
+def _norm_url(url):
+    url = (url or '').strip()
+    parts = urlsplit(url)
+    if not parts.scheme:
+        return url.lower()
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+
+def normalize_request(data):
+    """Fill in defaults so equivalent generation requests look identical"""
+    try:
+        word_count = int(data.get('word_count') or DEFAULT_WORD_COUNT)
+    except (TypeError, ValueError):
+        word_count = DEFAULT_WORD_COUNT
+    return {
+        'type': 'article' if data.get('type') == 'article' else 'topic',
+        'topic': _norm_text(data.get('topic')),
+        'url': _norm_url(data.get('url')),
+        'industry': _norm_text(data.get('industry')) or DEFAULT_INDUSTRY,
+        'tone': _norm_text(data.get('tone')) or DEFAULT_TONE,
+        'model': _norm_text(data.get('model')) or DEFAULT_MODEL,
+        'word_count': word_count,
+        'long_article': data.get('type') == 'article' and bool(data.get('long_article')),
+    }
+
+
+def make_key(data):
+    """Cache key for a /api/generate-post payload"""
+    n = normalize_request(data)
+    subject = n['url'] if n['type'] == 'article' else n['topic']
+    parts = [n['type'], subject, n['industry'], n['tone'], n['model'], str(n['word_count'])]
+    if n['long_article']:
+        parts.append('long')
+    return '|'.join(parts)
+
+
+def _sizeof(value):
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(json.dumps(value, default=str).encode('utf-8'))
+
+
+class ResponseCache:
+    """Thread-safe in-process LRU cache with per-entry TTL and a byte budget
+
+    With an `l2` (anything with get_with_ttl/set/delete, e.g. a NamespacedCache
+    over the host-wide shared table or Redis), local misses fall through to it
+    and every set is written to both, so this cache acts as the local L1. A
+    value copied up from the L2 keeps the L2 entry's remaining lifetime.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES, ttl=RESPONSE_CACHE_TTL, l2=None):
+        self.l2 = l2
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, count=True):
+        """Cached value or None; count=False leaves hits and misses alone, for lookups
+        made on behalf of another cache that keeps its own counts"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                self._remove(key)
+                self.expirations += 1
+        found = self.l2.get_with_ttl(key) if self.l2 is not None else None
+        if found is None:
+            if count:
+                with self._lock:
+                    self.misses += 1
+            return None
+        value, remaining = found
+        self._store(key, value, remaining)
+        if count:
+            with self._lock:
+                self.hits += 1
+        return value
+
+    def set(self, key, value, ttl=None):
+        if self.l2 is not None:
+            self.l2.set(key, value, self.ttl if ttl is None else ttl)
+        self._store(key, value, ttl)
+
+    def _store(self, key, value, ttl=None):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        if self.l2 is not None:
+            self.l2.delete(key)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+            }
@@ -0,0 +1,144 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get('RETRY_MAX_ATTEMPTS', 3))
+RETRY_BASE_DELAY = float(os.environ.get('RETRY_BASE_DELAY', 0.25))
+RETRY_MAX_DELAY = float(os.environ.get('RETRY_MAX_DELAY', 4))
+RETRY_MAX_RETRY_AFTER = float(os.environ.get('RETRY_MAX_RETRY_AFTER', 10))
+RETRY_BUDGET_RATIO = float(os.environ.get('RETRY_BUDGET_RATIO', 0.2))
+RETRY_BUDGET_BURST = float(os.environ.get('RETRY_BUDGET_BURST', 10))
+
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class ProviderError(Exception):
+    """Non-200 answer from an LLM provider"""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, provider, response):
+        return cls(
+            f"{provider} API error: {response.status_code} - {response.text}",
+            status_code=response.status_code,
+            retry_after=parse_retry_after(response.headers.get('Retry-After'))
+        )
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def is_retryable(error):
+    if isinstance(error, ProviderError):
+        return error.status_code in RETRYABLE_STATUSES
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class RetryBudget:
+    """Caps retries to a fraction of calls so retries cannot amplify an outage
+
+    Every first attempt deposits `ratio` tokens (up to `burst`); every retry
+    spends one.
+    """
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, burst=RETRY_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def withdraw(self):
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter that honours Retry-After"""
+
+    def __init__(self, max_attempts=RETRY_MAX_ATTEMPTS, base_delay=RETRY_BASE_DELAY,
+                 max_delay=RETRY_MAX_DELAY, max_retry_after=RETRY_MAX_RETRY_AFTER,
+                 budget=None, retryable=is_retryable):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.budget = budget if budget is not None else RetryBudget()
+        self.retryable = retryable
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.budget_exhausted = 0
+
+    def backoff(self, attempt, error=None):
+        """Delay before retry number `attempt` (1-based)"""
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, fn, deadline=None):
+        """Run fn, retrying retryable errors within the attempt limit, budget and deadline"""
+        with self._lock:
+            self.calls += 1
+        self.budget.deposit()
+        attempt = 1
+        while True:
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.retryable(e):
+                    raise
+                delay = self.backoff(attempt, e)
+                remaining = deadline.remaining() if deadline is not None else None
+                if remaining is not None and delay >= remaining:
+                    raise
+                if not self.budget.withdraw():
+                    with self._lock:
+                        self.budget_exhausted += 1
+                    raise
+                with self._lock:
+                    self.retries += 1
+                print(f"🔁 Retrying after {delay:.2f}s (attempt {attempt + 1}/{self.max_attempts}): {e}")
+                self._sleep(delay, deadline)
+                attempt += 1
+
+    def _sleep(self, delay, deadline):
+        end = time.monotonic() + delay
+        while True:
+            if deadline is not None:
+                deadline.check()
+            left = end - time.monotonic()
+            if left <= 0:
+                return
+            time.sleep(min(left, 0.25))
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'retries': self.retries, 'budget_exhausted': self.budget_exhausted}
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+
+from response_cache import normalize_request
+
+SEMANTIC_CACHE_ENABLED = os.environ.get('SEMANTIC_CACHE_ENABLED', 'true').lower() != 'false'
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', 0.8))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.environ.get('SEMANTIC_CACHE_MAX_ENTRIES', 200000))
+SEMANTIC_CACHE_VARY = os.environ.get('SEMANTIC_CACHE_VARY', 'false').lower() == 'true'
+
+# 32 MinHash values in 8 bands of 4: pairs above ~0.6 Jaccard share a band with high probability
+NUM_HASHES = 32
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(0, PRIME)) for _ in range(NUM_HASHES)]
+
+WORD = re.compile(r'[a-z0-9+#]+')
+# Stopwords, plus words that only repeat the industry picklist ("AI for the healthcare industry").
+# Words like future, tips, impact, how or vs name what kind of post is wanted
+# ("The future of remote work" is not "Tips for remote work"), so they stay
+FILLER = frozenset('''
+a an the and or of in on for to with about at by from into is are its it's my our your
+industry sector field space
+'''.split())
+
+
+def _stem(word):
+    for suffix in ('ies', 'ing', 'es', 's'):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)] + ('y' if suffix == 'ies' else '')
+    return word
+
+
+def topic_terms(topic):
+    """Normalized term set of a topic: lowercased, stopwords dropped, plurals folded"""
+    return frozenset(_stem(w) for w in WORD.findall((topic or '').lower()) if w not in FILLER)
+
+
+def _signature(terms):
+    hashes = [int.from_bytes(hashlib.blake2b(t.encode('utf-8'), digest_size=8).digest(), 'big') for t in terms]
+    return [min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class SemanticCache:
+    """Finds a previously generated topic post whose topic nearly matches a new request
+
+    Requests are partitioned exactly on type, industry, tone, model and word
+    count. Within a partition, topics are compared as term sets: MinHash LSH
+    bands find candidates in constant time, and exact Jaccard similarity
+    against `threshold` decides. The index only maps to response cache keys,
+    so posts themselves live (and expire) in the response cache.
+    """
+
+    def __init__(self, response_cache, threshold=SEMANTIC_CACHE_THRESHOLD,
+                 max_entries=SEMANTIC_CACHE_MAX_ENTRIES, enabled=SEMANTIC_CACHE_ENABLED):
+        self.response_cache = response_cache
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._entries = OrderedDict()
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _partition(self, n):
+        return '|'.join([n['industry'], n['tone'], n['model'], str(n['word_count'])])
+
+    def _bands(self, partition, terms):
+        # Bands are kept as plain ints; a rare collision only adds a candidate that Jaccard rejects
+        signature = _signature(terms)
+        return tuple(hash((partition, i, *signature[i * ROWS:(i + 1) * ROWS])) for i in range(BANDS))
+
+    def add(self, data, cache_key):
+        n = normalize_request(data)
+        if not self.enabled or n['type'] != 'topic':
+            return
+        terms = topic_terms(n['topic'])
+        if not terms:
+            return
+        bands = self._bands(self._partition(n), terms)
+        with self._lock:
+            if cache_key in self._entries:
+                self._remove(cache_key)
+            self._entries[cache_key] = (terms, bands)
+            for band in bands:
+                # Most buckets hold a single key; only shared ones pay for a set
+                bucket = self._buckets.get(band)
+                if bucket is None:
+                    self._buckets[band] = cache_key
+                elif isinstance(bucket, set):
+                    bucket.add(cache_key)
+                elif bucket != cache_key:
+                    self._buckets[band] = {bucket, cache_key}
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def lookup(self, data):
+        """Return (post, similarity) for the closest cached near-duplicate, or None"""
+        n = normalize_request(data)
+        if not self.enabled or n['type'] != 'topic':
+            return None
+        terms = topic_terms(n['topic'])
+        if not terms:
+            return None
+        bands = self._bands(self._partition(n), terms)
+        with self._lock:
+            candidates = set()
+            for band in bands:
+                bucket = self._buckets.get(band)
+                if isinstance(bucket, set):
+                    candidates.update(bucket)
+                elif bucket is not None:
+                    candidates.add(bucket)
+            scored = sorted(((jaccard(terms, self._entries[key][0]), key) for key in candidates), reverse=True)
+        for similarity, key in scored:
+            if similarity < self.threshold:
+                break
+            # Counted as a semantic hit or miss below, not as an exact-key lookup
+            post = self.response_cache.get(key, count=False)
+            if post is None:
+                # Expired or evicted from the response cache
+                with self._lock:
+                    if key in self._entries:
+                        self._remove(key)
+                continue
+            with self._lock:
+                self.hits += 1
+            return post, similarity
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remove(self, key):
+        _, bands = self._entries.pop(key)
+        for band in bands:
+            bucket = self._buckets.get(band)
+            if isinstance(bucket, set):
+                bucket.discard(key)
+                if len(bucket) == 1:
+                    self._buckets[band] = bucket.pop()
+            elif bucket == key:
+                del self._buckets[band]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits / lookups) if lookups else 0.0,
+                'threshold': self.threshold,
+            }
+
+
+def vary(post, rng=random):
+    """Cheap local variation of a reused post: reshuffle its closing hashtag line"""
+    lines = post.rstrip().split('\n')
+    tags = lines[-1].split()
+    if len(tags) > 1 and all(tag.startswith('#') for tag in tags):
+        rng.shuffle(tags)
+        lines[-1] = ' '.join(tags)
+    return '\n'.join(lines)
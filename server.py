@@ -4,42 +4,535 @@ import socketserver
 import webbrowser
 import os
 import json
+import threading
+import time
+import select
+import socket
+import signal
+import hashlib
+import provider_client
 import requests
+from urllib3.exceptions import ReadTimeoutError
+from response_cache import ResponseCache, make_key, DEFAULT_INDUSTRY, DEFAULT_TONE, RESPONSE_CACHE_TTL
+from cache_backends import create_backend, NamespacedCache
+from article_cache import ArticleCache, canonicalize_url, ARTICLE_CACHE_L2_TTL
+from static_assets import StaticAssets
+from prefork import Supervisor, reuse_port_supported, PREFORK_SHUTDOWN_GRACE
+from semantic_cache import SemanticCache, SEMANTIC_CACHE_VARY, vary
+from hedging import Hedger
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from singleflight import SingleFlight
+from metrics import REGISTRY
+from admission import AdmissionController, RateLimited
+from deadline import Deadline, DeadlineExceeded, RequestCancelled, NO_DEADLINE, MIN_CALL_TIMEOUT
+from retry_policy import RetryPolicy, ProviderError
+import article_fetcher
+from extractors import ExtractionEngine, ExtractionError
+from extraction_pool import ExtractionPool
+from summarizer import summarize, chunk_text, estimate_tokens
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import urlparse, parse_qs
 import urllib.request
-from bs4 import BeautifulSoup
 
 # Configuration
 DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.environ.get('STATIC_DIR', DIRECTORY)
 PORT = int(os.environ.get('PORT', 8000))
 HOST = os.environ.get('HOST', '0.0.0.0')
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY')
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
+# Pre-forked processes. Rate limits (RATE_LIMIT_*, CLIENT_RATE_LIMIT_*) stay totals for the whole
+# server: each worker enforces 1/WEB_WORKERS of them, on the connections the kernel hands it
+WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 1))
+# Keys that get their own rate-limit bucket; any other X-API-Key is ignored
+CLIENT_API_KEYS = {key.strip() for key in os.environ.get('CLIENT_API_KEYS', '').split(',') if key.strip()}
+# Proxies in front of us that append to X-Forwarded-For (Railway and Render each add one)
+TRUSTED_PROXY_HOPS = int(os.environ.get('TRUSTED_PROXY_HOPS', 1 if os.environ.get('RAILWAY_ENVIRONMENT') or os.environ.get('RENDER') else 0))
+WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 16))
+SHARED_CACHE_ENABLED = os.environ.get('SHARED_CACHE_ENABLED', str(WEB_WORKERS > 1)).lower() == 'true'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'shm' if SHARED_CACHE_ENABLED else 'none')
+MAX_QUEUED_REQUESTS = int(os.environ.get('MAX_QUEUED_REQUESTS', 64))
+KEEPALIVE_TIMEOUT = float(os.environ.get('KEEPALIVE_TIMEOUT', 15))
+KEEPALIVE_MAX_REQUESTS = int(os.environ.get('KEEPALIVE_MAX_REQUESTS', 100))
+REQUEST_IO_TIMEOUT = float(os.environ.get('REQUEST_IO_TIMEOUT', 60))
+# Leave the supervisor's grace period a little slack before it resorts to SIGKILL
+SHUTDOWN_DRAIN_SECONDS = float(os.environ.get('SHUTDOWN_DRAIN_SECONDS', max(0.0, PREFORK_SHUTDOWN_GRACE - 1)))
+PROVIDER_WORKERS = int(os.environ.get('PROVIDER_WORKERS', 32))
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 200))
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 16))
+BATCH_PROVIDER_CONCURRENCY = int(os.environ.get('BATCH_PROVIDER_CONCURRENCY', 4))
+STREAM_DEADLINE_SECONDS = float(os.environ.get('STREAM_DEADLINE_SECONDS', 60))
+BATCH_DEADLINE_SECONDS = float(os.environ.get('BATCH_DEADLINE_SECONDS', 300))
+EXTRACTION_DEADLINE_SHARE = float(os.environ.get('EXTRACTION_DEADLINE_SHARE', 0.3))
+PRIMARY_DEADLINE_SHARE = float(os.environ.get('PRIMARY_DEADLINE_SHARE', 0.6))
+ARTICLE_FETCH_TIMEOUT = float(os.environ.get('ARTICLE_FETCH_TIMEOUT', 10))
+ARTICLE_MIN_TEXT = int(os.environ.get('ARTICLE_MIN_TEXT', 300))
+LONG_ARTICLE_TEXT_TARGET = int(os.environ.get('LONG_ARTICLE_TEXT_TARGET', 60000))
+LONG_ARTICLE_CHUNK_TOKENS = int(os.environ.get('LONG_ARTICLE_CHUNK_TOKENS', 900))
+LONG_ARTICLE_MAX_CHUNKS = int(os.environ.get('LONG_ARTICLE_MAX_CHUNKS', 8))
+LONG_ARTICLE_WORKERS = int(os.environ.get('LONG_ARTICLE_WORKERS', 4))
+LONG_ARTICLE_MAP_SHARE = float(os.environ.get('LONG_ARTICLE_MAP_SHARE', 0.5))
+# Overridable so load tests can point at mock_providers.py instead of the live APIs
+GEMINI_MODEL_URL = os.environ.get('GEMINI_MODEL_URL', "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash")
+OPENROUTER_CHAT_URL = os.environ.get('OPENROUTER_CHAT_URL', "https://openrouter.ai/api/v1/chat/completions")
+
+# Created before any fork so every pre-forked worker maps the same shared-memory table
+L2_CACHE = create_backend(CACHE_BACKEND)
+RESPONSE_CACHE = ResponseCache(l2=NamespacedCache('posts', L2_CACHE, RESPONSE_CACHE_TTL) if L2_CACHE else None)
+SEMANTIC_CACHE = SemanticCache(RESPONSE_CACHE)
+# Long-article chunk summaries; kept apart so they neither evict posts nor skew the post hit ratio
+CHUNK_CACHE = ResponseCache(l2=NamespacedCache('chunks', L2_CACHE, RESPONSE_CACHE_TTL) if L2_CACHE else None)
+STATIC_ASSETS = StaticAssets(STATIC_DIR)
+ARTICLE_CACHE = ArticleCache(l2=NamespacedCache('articles', L2_CACHE, ARTICLE_CACHE_L2_TTL) if L2_CACHE else None)
+EXTRACTION_POOL = ExtractionPool()
+# Only needed in-process when the pool is off; the pool's workers build their own
+EXTRACTION_ENGINE = None if EXTRACTION_POOL.enabled else ExtractionEngine()
+PROVIDER_EXECUTOR = ThreadPoolExecutor(max_workers=PROVIDER_WORKERS, thread_name_prefix='provider')
+HEDGER = Hedger(PROVIDER_EXECUTOR)
+BREAKERS = {'gemini': CircuitBreaker('gemini'), 'openrouter': CircuitBreaker('openrouter')}
+PROVIDER_RETRIES = {name: RetryPolicy() for name in BREAKERS}
+GENERATION_FLIGHTS = SingleFlight('generation', retry_on=(DeadlineExceeded, RequestCancelled))
+EXTRACTION_FLIGHTS = SingleFlight('extraction', retry_on=(DeadlineExceeded, RequestCancelled))
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch')
+CHUNK_EXECUTOR = ThreadPoolExecutor(max_workers=LONG_ARTICLE_WORKERS, thread_name_prefix='chunk')
+ADMISSION = AdmissionController()
+BATCH_SLOTS = {name: threading.BoundedSemaphore(BATCH_PROVIDER_CONCURRENCY) for name in BREAKERS}
+STAGE_SECONDS = REGISTRY.histogram('linkedin_stage_duration_seconds', 'Time spent in each request stage', ['stage'])
+PROVIDER_SECONDS = REGISTRY.histogram('linkedin_provider_call_duration_seconds', 'LLM provider call latency', ['provider', 'outcome'])
+HTTP_RESPONSES = REGISTRY.counter('linkedin_http_responses_total', 'HTTP responses sent', ['route', 'status'])
+ERRORS = REGISTRY.counter('linkedin_errors_total', 'Errors by stage', ['stage'])
+ARTICLE_FETCH_BYTES = REGISTRY.histogram('linkedin_article_fetch_bytes', 'Bytes read per article fetch', ['truncated'],
+                                         buckets=(16384, 65536, 262144, 524288, 1048576, 2097152, 4194304))
+CHUNK_SUMMARIES = REGISTRY.counter('linkedin_chunk_summaries_total', 'Long-article chunk summaries by source', ['source'])
+EXTRACTIONS = REGISTRY.counter('linkedin_extractions_total', 'Article extractions by backend', ['backend'])
+ARTICLE_LOOKUPS = REGISTRY.counter('linkedin_article_lookups_total', 'Article extraction cache outcomes', ['result'])
+REQUESTS_IN_FLIGHT = REGISTRY.gauge('linkedin_requests_in_flight', 'API requests currently being handled', ['route'])
+PROVIDER_IN_FLIGHT = REGISTRY.gauge('linkedin_provider_calls_in_flight', 'LLM provider calls currently running', ['provider'])
+REGISTRY.callback_counter('linkedin_fallbacks_total', 'Calls that fell back after the primary provider failed', lambda: HEDGER.fallbacks)
+REGISTRY.callback_counter('linkedin_hedges_total', 'Hedged fallback calls fired', lambda: HEDGER.hedged)
+REGISTRY.callback_counter('linkedin_hedge_wins_total', 'Hedged calls that beat the primary', lambda: HEDGER.hedge_wins)
+REGISTRY.callback_counter('linkedin_response_cache_hits_total', 'Response cache hits', lambda: RESPONSE_CACHE.hits)
+REGISTRY.callback_counter('linkedin_response_cache_misses_total', 'Response cache misses', lambda: RESPONSE_CACHE.misses)
+REGISTRY.callback_gauge('linkedin_response_cache_hit_ratio', 'Response cache hit ratio since start', lambda: RESPONSE_CACHE.stats()['hit_ratio'])
+REGISTRY.callback_gauge('linkedin_response_cache_bytes', 'Bytes held by the response cache', lambda: RESPONSE_CACHE.stats()['bytes'])
+REGISTRY.callback_counter('linkedin_semantic_cache_hits_total', 'Topic requests served by a near-duplicate cached post', lambda: SEMANTIC_CACHE.hits)
+REGISTRY.callback_gauge('linkedin_l2_cache_hit_ratio', 'Hit ratio of the shared (shm, disk or redis) L2 cache',
+                        lambda: L2_CACHE.stats()['hit_ratio'] if L2_CACHE is not None else 0.0)
+REGISTRY.callback_gauge('linkedin_article_cache_bytes', 'Bytes held by the on-disk article cache', lambda: ARTICLE_CACHE.stats()['bytes'])
+REGISTRY.callback_counter('linkedin_coalesced_requests_total', 'Requests served by an identical in-flight call',
+                          lambda: {('generation',): GENERATION_FLIGHTS.shared, ('extraction',): EXTRACTION_FLIGHTS.shared}, ['stage'])
+REGISTRY.callback_counter('linkedin_provider_retries_total', 'Provider call retries',
+                          lambda: {(name,): policy.retries for name, policy in PROVIDER_RETRIES.items()}, ['provider'])
+REGISTRY.callback_counter('linkedin_retry_budget_exhausted_total', 'Retries skipped because the retry budget was spent',
+                          lambda: {(name,): policy.budget_exhausted for name, policy in PROVIDER_RETRIES.items()}, ['provider'])
+REGISTRY.callback_gauge('linkedin_circuit_open', '1 while a provider circuit is open or half-open',
+                        lambda: {(name,): int(b.state != 'closed') for name, b in BREAKERS.items()}, ['provider'])
+REGISTRY.callback_counter('linkedin_extraction_worker_events_total', 'Extraction worker timeouts, crashes and recycles',
+                          lambda: {(event,): EXTRACTION_POOL.stats()[event] for event in ('timeouts', 'crashes', 'recycled')}, ['event'])
+REGISTRY.callback_gauge('linkedin_admission_queue_depth', 'Requests waiting for rate-limit tokens', lambda: ADMISSION.waiting)
+REGISTRY.callback_counter('linkedin_admission_rejections_total', 'Requests rejected with 429',
+                          lambda: {(reason,): count for reason, count in ADMISSION.stats()['rejected'].items()}, ['reason'])
+ARTICLE_USER_AGENT = 'Mozilla/5.0 (compatible; LinkedInPostGenerator/1.0)'
+# Fixed route label values; anything else under /api/ is counted as 'other'
+API_ROUTES = {'/api/stats', '/api/providers', '/api/generate-post', '/api/generate-post/stream', '/api/generate-posts', '/metrics'}
+# Unread request bodies up to this size are drained so the connection can be reused
+KEEPALIVE_DISCARD_BYTES = 64 * 1024
+KEEPALIVE_POLL_SECONDS = 0.5
 
 if not GEMINI_API_KEY:
     print("❌ Error: GEMINI_API_KEY environment variable not set!")
     exit(1)
 
+def is_timeout(error):
+    """True for a provider read or connect timeout, including one raised mid-stream
+
+    While streaming, requests reports a read timeout as a ConnectionError wrapping urllib3's ReadTimeoutError.
+    """
+    if isinstance(error, requests.Timeout):
+        return True
+    return isinstance(error, requests.ConnectionError) and bool(error.args) and isinstance(error.args[0], ReadTimeoutError)
+
+class PooledHTTPServer(socketserver.TCPServer):
+    """TCPServer that hands each connection to a bounded pool of worker threads"""
+    allow_reuse_address = True
+    request_queue_size = 128
+    draining = False
+
+    def __init__(self, server_address, handler_class, workers=WORKER_THREADS, max_queued=MAX_QUEUED_REQUESTS, reuse_port=False):
+        self.reuse_port = reuse_port
+        super().__init__(server_address, handler_class)
+        self.workers = max(1, workers)
+        self.max_pending = self.workers + max(0, max_queued)
+        self.pending = 0
+        self.pending_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='http-worker')
+
+    def server_bind(self):
+        # Pre-forked workers each bind the same port; the kernel spreads connections across them
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    @property
+    def queue_depth(self):
+        """Connections accepted but not yet picked up by a worker"""
+        return max(0, self.pending - self.workers)
+
+    def process_request(self, request, client_address):
+        with self.pending_lock:
+            if self.pending >= self.max_pending:
+                full = True
+            else:
+                full = False
+                self.pending += 1
+        if full:
+            self.reject_request(request)
+            return
+        try:
+            self.executor.submit(self.process_request_worker, request, client_address)
+        except RuntimeError:
+            self.release_slot()
+            self.shutdown_request(request)
+
+    def process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self.release_slot()
+
+    def release_slot(self):
+        with self.pending_lock:
+            self.pending -= 1
+
+    def reject_request(self, request):
+        body = b'Server busy, please retry'
+        try:
+            request.sendall(
+                b'HTTP/1.0 503 Service Unavailable\r\n'
+                b'Content-Type: text/plain\r\n'
+                b'Retry-After: 1\r\n'
+                b'Connection: close\r\n'
+                b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+            )
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def shutdown(self):
+        # Idle keep-alive connections notice this and close instead of waiting for another request
+        self.draining = True
+        super().shutdown()
+
+    def drain(self, timeout=SHUTDOWN_DRAIN_SECONDS):
+        """Wait up to timeout seconds for accepted connections to finish; True if they all did"""
+        end = time.monotonic() + timeout
+        while self.pending and time.monotonic() < end:
+            time.sleep(0.05)
+        return not self.pending
+
+    def server_close(self):
+        super().server_close()
+        # In-flight requests get to finish before the process exits
+        if not self.drain():
+            print(f"⚠️  {self.pending} connections still open after {SHUTDOWN_DRAIN_SECONDS:.0f}s, closing anyway")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """API and static file handler speaking HTTP/1.1 with persistent connections
+
+    Every response is framed by Content-Length, or chunked for streams, so a
+    connection can carry up to KEEPALIVE_MAX_REQUESTS requests (pipelined or
+    not). Between requests it may sit idle for KEEPALIVE_TIMEOUT seconds, less
+    when other connections are queued for a worker thread.
+    """
+    protocol_version = 'HTTP/1.1'
+    timeout = REQUEST_IO_TIMEOUT
+    # Headers and body go out as separate writes; Nagle plus delayed ACKs would stall reused connections
+    disable_nagle_algorithm = True
+    deadline = NO_DEADLINE
+    requests_served = 0
+    request_parsed = False
+    body_read = False
+    chunked = False
+
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
+        super().__init__(*args, directory=STATIC_DIR, **kwargs)
+
+    def handle_one_request(self):
+        if self.requests_served and not self.wait_for_request():
+            self.close_connection = True
+            return
+        super().handle_one_request()
+
+    def wait_for_request(self):
+        """True once the next request has started to arrive on this connection
+
+        False when the client closes, stays idle past KEEPALIVE_TIMEOUT, or the
+        worker thread is needed for a queued connection or a shutdown.
+        """
+        end = time.monotonic() + KEEPALIVE_TIMEOUT
+        readable = False
+        while True:
+            # Pipelined requests may already sit in rfile's buffer, where select() cannot see them
+            self.connection.setblocking(False)
+            try:
+                pending = self.rfile.peek(1)
+            except OSError:
+                return False
+            finally:
+                self.connection.settimeout(self.timeout)
+            if pending:
+                return True
+            if readable:
+                # Readable but nothing to read: the client closed its end
+                return False
+            remaining = end - time.monotonic()
+            if remaining <= 0 or self.server.queue_depth or self.server.draining:
+                return False
+            try:
+                readable = bool(select.select([self.connection], [], [], min(remaining, KEEPALIVE_POLL_SECONDS))[0])
+            except (OSError, ValueError):
+                return False
+
+    def parse_request(self):
+        self.request_parsed = self.body_read = self.chunked = False
+        if not super().parse_request():
+            return False
+        self.request_parsed = True
+        self.requests_served += 1
+        return True
+
+    def discard_body(self):
+        """Consume a request body the handler did not read; False if it cannot be skipped"""
+        if self.body_read:
+            return True
+        if self.headers.get('Transfer-Encoding'):
+            return False
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            return False
+        if length > KEEPALIVE_DISCARD_BYTES:
+            return False
+        if length and len(self.rfile.read(length)) != length:
+            return False
+        self.body_read = True
+        return True
+
+    def send_header(self, keyword, value):
+        # end_headers decides keep-alive for every parsed request, overriding send_error's unconditional close
+        if keyword.lower() == 'connection' and self.request_parsed:
+            return
+        super().send_header(keyword, value)
 
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Cache-Control, X-API-Key')
+        if self.request_parsed:
+            self.send_connection_header()
         super().end_headers()
 
+    def send_connection_header(self):
+        if not self.close_connection and (self.requests_served >= KEEPALIVE_MAX_REQUESTS or self.server.draining
+                                          or self.server.queue_depth or not self.discard_body()):
+            self.close_connection = True
+        if self.close_connection and self.request_version != 'HTTP/1.0':
+            super().send_header('Connection', 'close')
+        elif not self.close_connection and self.request_version == 'HTTP/1.0':
+            super().send_header('Connection', 'keep-alive')
+
+    def begin_chunked(self):
+        """Frame a body of unknown length: chunked for HTTP/1.1 clients, else ended by closing
+
+        Call before end_headers, then write with write_chunk and finish with end_chunked.
+        """
+        self.chunked = self.request_version != 'HTTP/1.0'
+        if self.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+
+    def write_chunk(self, data):
+        if self.chunked:
+            data = b'%x\r\n%s\r\n' % (len(data), data)
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def end_chunked(self):
+        if self.chunked:
+            self.wfile.write(b'0\r\n\r\n')
+            self.chunked = False
+
+    def route(self):
+        # Malformed request lines are answered before self.path is set
+        path = getattr(self, 'path', '').split('?', 1)[0]
+        if path in API_ROUTES:
+            return path
+        return 'other' if path.startswith('/api/') else 'static'
+
+    def send_response(self, code, message=None):
+        HTTP_RESPONSES.inc(route=self.route(), status=code)
+        super().send_response(code, message)
+
     def do_OPTIONS(self):
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.end_headers()
 
-    def do_POST(self):
-        if self.path == '/api/generate-post':
-            self.handle_generate_post()
+    def do_GET(self):
+        if self.path == '/api/stats':
+            self.send_json(200, {
+                'pid': os.getpid(),
+                'worker': REGISTRY.const_labels.get('worker'),
+                'response_cache': RESPONSE_CACHE.stats(),
+                'l2_cache': {'backend': L2_CACHE.name, **L2_CACHE.stats()} if L2_CACHE is not None else None,
+                'semantic_cache': SEMANTIC_CACHE.stats(),
+                'chunk_cache': CHUNK_CACHE.stats(),
+                'article_cache': ARTICLE_CACHE.stats(),
+                'hedging': HEDGER.stats(),
+                'providers': self.provider_health(),
+                'admission': ADMISSION.stats(),
+                'extraction_pool': EXTRACTION_POOL.stats(),
+                'static_assets': STATIC_ASSETS.stats(),
+                'coalescing': {
+                    'generation': GENERATION_FLIGHTS.stats(),
+                    'extraction': EXTRACTION_FLIGHTS.stats()
+                }
+            })
+        elif self.path == '/api/providers':
+            self.send_json(200, self.provider_health())
+        elif self.path == '/metrics':
+            body = REGISTRY.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
         else:
+            self.serve_static()
+
+    def do_HEAD(self):
+        self.serve_static(head=True)
+
+    def serve_static(self, head=False):
+        """Serve a file from the startup index: in-memory and precompressed, or sendfile for large files"""
+        asset = STATIC_ASSETS.lookup(self.path)
+        if asset is None:
+            if STATIC_ASSETS.resolve(self.path) is None:
+                self.send_error(404)
+            elif head:
+                super().do_HEAD()
+            else:
+                # Directory listings, "/dir" -> "/dir/" redirects and 404s
+                super().do_GET()
+            return
+
+        encoding, body = asset.negotiate(self.headers.get('Accept-Encoding'))
+        if_none_match = self.headers.get('If-None-Match')
+        if asset.not_modified(if_none_match) or (not if_none_match and asset.not_modified_since(self.headers.get('If-Modified-Since'))):
+            self.send_response(304)
+            self.send_header('ETag', asset.etag_for(encoding))
+            self.send_header('Cache-Control', asset.cache_control)
+            # No Content-Length: on a 304 it would claim the length of the 200 body
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(len(body) if body is not None else asset.size))
+        self.send_header('ETag', asset.etag_for(encoding))
+        self.send_header('Last-Modified', asset.last_modified)
+        self.send_header('Cache-Control', asset.cache_control)
+        if asset.encodings:
+            self.send_header('Vary', 'Accept-Encoding')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        if head:
+            return
+        if body is not None:
+            self.wfile.write(body)
+        else:
+            with open(asset.path, 'rb') as f:
+                self.connection.sendfile(f)
+
+    def provider_health(self):
+        return {name: {**breaker.snapshot(), 'retries': PROVIDER_RETRIES[name].stats()} for name, breaker in BREAKERS.items()}
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        routes = {
+            '/api/generate-post': (self.handle_generate_post, None),
+            '/api/generate-post/stream': (self.handle_generate_post_stream, STREAM_DEADLINE_SECONDS),
+            '/api/generate-posts': (self.handle_generate_posts, BATCH_DEADLINE_SECONDS)
+        }
+        handler, default_deadline = routes.get(self.path, (None, None))
+        if handler is None:
             self.send_error(404)
+            return
+        try:
+            # Batches are also charged for each item that misses the cache (generate_batch_item)
+            ADMISSION.admit(self.client_id())
+        except RateLimited as e:
+            body = json.dumps({'error': str(e), 'retry_after': e.retry_after}).encode()
+            self.send_response(429)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Retry-After', e.retry_after_header)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.default_deadline = default_deadline
+        self.deadline = self.request_deadline(self.headers.get('X-Request-Timeout'))
+        with REQUESTS_IN_FLIGHT.track(route=self.route()):
+            handler()
+
+    def request_deadline(self, requested=None):
+        """Deadline for this request; requested is the client's budget in seconds"""
+        if self.default_deadline is None:
+            return Deadline.from_request(requested, is_cancelled=self.client_disconnected)
+        return Deadline.from_request(requested, default=self.default_deadline, is_cancelled=self.client_disconnected)
+
+    def apply_body_deadline(self, data):
+        if isinstance(data, dict) and data.get('deadline') is not None:
+            self.deadline = self.request_deadline(data['deadline'])
+
+    def client_disconnected(self):
+        """True once the client has closed its end of the connection"""
+        try:
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if readable:
+                return self.connection.recv(1, socket.MSG_PEEK) == b''
+        except (OSError, ValueError):
+            return True
+        return False
+
+    def client_id(self):
+        """Rate-limit identity: a configured API key if sent, else the caller's IP
+
+        The IP is the X-Forwarded-For entry appended by the outermost of
+        TRUSTED_PROXY_HOPS proxies; entries to its left are client-supplied.
+        """
+        api_key = self.headers.get('X-API-Key')
+        if api_key and api_key in CLIENT_API_KEYS:
+            return 'key:' + api_key
+        if TRUSTED_PROXY_HOPS > 0:
+            hops = [hop.strip() for hop in ','.join(self.headers.get_all('X-Forwarded-For') or []).split(',') if hop.strip()]
+            if len(hops) >= TRUSTED_PROXY_HOPS:
+                return 'ip:' + hops[-TRUSTED_PROXY_HOPS]
+        return 'ip:' + self.client_address[0]
 
     def ensure_hashtags_and_emojis(self, post, topic=None, industry=None):
         import re
@@ -82,43 +575,303 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             post = post.rstrip() + '\n' + ' '.join(extra_hashtags)
         return post.strip()
 
-    def handle_generate_post(self):
-        try:
+    def read_json_body(self):
+        with STAGE_SECONDS.time(stage='parse'):
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            self.body_read = True
+            return json.loads(post_data.decode('utf-8'))
+
+    def cache_options(self, data):
+        """Return (use_cache, refresh) for a request
+
+        "cache": false skips the cache entirely, "refresh": true (or
+        Cache-Control: no-cache) regenerates and stores the new post.
+        """
+        use_cache = data.get('cache', True) is not False
+        refresh = bool(data.get('refresh')) or 'no-cache' in (self.headers.get('Cache-Control') or '')
+        return use_cache, refresh
+
+    def cached_post(self, data, cache_key):
+        """Return (post, 'HIT'), (post, 'SIMILAR') for a near-duplicate topic, or (None, None)
+
+        "similar": false in the body limits the lookup to exact matches.
+        """
+        post = RESPONSE_CACHE.get(cache_key)
+        if post is not None:
+            return post, 'HIT'
+        if data.get('similar', True) is not False:
+            match = SEMANTIC_CACHE.lookup(data)
+            if match is not None:
+                return (vary(match[0]) if SEMANTIC_CACHE_VARY else match[0]), 'SIMILAR'
+        return None, None
+
+    def post_title(self, data):
+        return f"🚀 {data.get('topic', 'LinkedIn Growth Strategy')[:60]} – Key Takeaway for {data.get('industry', 'Professionals')}"
+
+    def handle_generate_post(self):
+        try:
+            data = self.read_json_body()
+            self.apply_body_deadline(data)
 
             if not GEMINI_API_KEY:
                 self.send_error(500, "Gemini API key not configured")
                 return
 
-            model = data.get('model', 'gemini').lower()
-            word_count = int(data.get('word_count', 80))
-
-            if data.get('type') == 'article':
-                post = self.generate_post_from_article(data['url'], data['industry'], data['tone'], model, word_count)
-            else:
-                post = self.generate_post_from_topic(data['topic'], data['industry'], data['tone'], model, word_count)
-
-            post = self.ensure_hashtags_and_emojis(post, data.get('topic'), data.get('industry'))
+            post, cache_status = self.generate_for_request(data)
 
             response = {
                 'post': post,
-                'title': f"🚀 {data.get('topic', 'LinkedIn Growth Strategy')[:60]} – Key Takeaway for {data.get('industry', 'Professionals')}"
+                'title': self.post_title(data)
             }
 
+            body = json.dumps(response).encode()
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('X-Cache', cache_status)
             self.end_headers()
-            self.wfile.write(json.dumps(response).encode())
+            self.wfile.write(body)
 
+        # Reason phrases are fixed: exception text (upstream bodies included) could hold
+        # newlines or non-Latin-1 characters that break the status line; details go to the log
+        except CircuitOpenError as e:
+            print(f"Circuit open: {e}")
+            self.send_error(503, "All LLM providers are currently unavailable")
+        except DeadlineExceeded as e:
+            print(f"Deadline exceeded: {e}")
+            ERRORS.inc(stage='deadline')
+            self.send_error(504, "Request deadline exceeded")
+        except RequestCancelled:
+            print("⚠️  Client disconnected, abandoning request")
+            self.close_connection = True
         except Exception as e:
             print(f"Error generating post: {e}")
-            self.send_error(500, str(e))
+            ERRORS.inc(stage='request')
+            self.send_error(500, "Failed to generate post")
+
+    def lookup_for_request(self, data):
+        """Return (post, cache_status) if the cache can answer a generate-post payload, else (None, None)"""
+        use_cache, refresh = self.cache_options(data)
+        if not use_cache or refresh:
+            return None, None
+        return self.cached_post(data, make_key(data))
+
+    def generate_for_request(self, data, lookup=True, provider=None):
+        """Produce the final post for one generate-post payload
+
+        Returns (post, cache_status) where cache_status is HIT, SIMILAR, MISS or BYPASS.
+        lookup=False skips the cache read, for callers that already missed in lookup_for_request.
+        provider overrides which provider is tried first without changing the cache key.
+        """
+        model = provider or data.get('model', 'gemini').lower()
+        word_count = int(data.get('word_count', 80))
+        industry = data.get('industry') or DEFAULT_INDUSTRY
+        tone = data.get('tone') or DEFAULT_TONE
+
+        use_cache, refresh = self.cache_options(data)
+        cache_key = make_key(data)
+        if lookup:
+            post, cache_status = self.lookup_for_request(data)
+            if post is not None:
+                return post, cache_status
+
+        def generate():
+            if data.get('type') == 'article':
+                post = self.generate_post_from_article(data['url'], industry, tone, model, word_count, bool(data.get('long_article')))
+            else:
+                post = self.generate_post_from_topic(data['topic'], industry, tone, model, word_count)
+            with STAGE_SECONDS.time(stage='postprocess'):
+                post = self.ensure_hashtags_and_emojis(post, data.get('topic'), industry)
+            if use_cache:
+                RESPONSE_CACHE.set(cache_key, post)
+                SEMANTIC_CACHE.add(data, cache_key)
+            return post
+
+        if not use_cache:
+            return generate(), 'BYPASS'
+        # Identical requests already in flight share one upstream generation
+        return GENERATION_FLIGHTS.do(cache_key, generate, self.deadline), 'MISS'
 
-    def call_gemini_api(self, prompt):
+    def handle_generate_posts(self):
+        """Generate many posts in one call
+
+        Body: {"items": [<generate-post payload>, ...], "defaults": {...}, "stream": true}.
+        Items run concurrently, at most BATCH_PROVIDER_CONCURRENCY at a time per
+        provider; items without a model are spread across healthy providers.
+        Results are streamed as NDJSON lines in completion order, or returned
+        as one JSON document when "stream" is false.
+        """
+        try:
+            data = self.read_json_body()
+        except Exception as e:
+            print(f"Invalid request body: {e}")
+            self.send_error(400, "Invalid JSON body")
+            return
+        if isinstance(data, list):
+            data = {'items': data}
+        self.apply_body_deadline(data)
+        items = data.get('items')
+        if not isinstance(items, list) or not items or not all(isinstance(item, dict) for item in items):
+            self.send_error(400, "Expected a non-empty 'items' array of objects")
+            return
+        if len(items) > BATCH_MAX_ITEMS:
+            self.send_error(400, f"At most {BATCH_MAX_ITEMS} items per batch")
+            return
+
+        defaults = data.get('defaults') or {}
+        client_id = self.client_id()
+        providers = [name for name in self.provider_order() if BREAKERS[name].available()] or ['gemini']
+        futures = {}
+        for index, item in enumerate(items):
+            spec = {**defaults, **item}
+            # Spreading only picks who runs the item; its cache key keeps the default model,
+            # so the same topic hits the cache wherever it sits in a batch
+            provider = str(spec['model']).lower() if spec.get('model') else providers[index % len(providers)]
+            futures[BATCH_EXECUTOR.submit(self.generate_batch_item, index, spec, provider, client_id)] = index
+
+        if data.get('stream', True) is False:
+            results = sorted((future.result() for future in as_completed(futures)), key=lambda r: r['index'])
+            self.send_json(200, {
+                'results': results,
+                'succeeded': sum(1 for r in results if 'post' in r),
+                'failed': sum(1 for r in results if 'error' in r)
+            })
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.begin_chunked()
+        self.end_headers()
+        succeeded = failed = 0
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                if 'post' in result:
+                    succeeded += 1
+                else:
+                    failed += 1
+                self.write_chunk((json.dumps(result) + '\n').encode())
+            self.write_chunk((json.dumps({'done': True, 'succeeded': succeeded, 'failed': failed}) + '\n').encode())
+            self.end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            print("⚠️  Client disconnected during batch, cancelling pending items")
+            self.close_connection = True
+            for future in futures:
+                future.cancel()
+
+    def generate_batch_item(self, index, spec, provider, client_id):
+        try:
+            self.deadline.check()
+            post, cache_status = self.lookup_for_request(spec)
+            if post is None:
+                # Only items that go to a provider are charged, and before taking a slot,
+                # so an item waiting for tokens never holds one another item could use.
+                # Items may wait out the batch's own deadline: a big batch is paced, not rejected
+                ADMISSION.admit(client_id, max_wait=max(ADMISSION.max_wait, self.deadline.remaining() or 0.0))
+                with BATCH_SLOTS.get(provider, BATCH_SLOTS['gemini']):
+                    self.deadline.check()
+                    post, cache_status = self.generate_for_request(spec, lookup=False, provider=provider)
+            return {'index': index, 'post': post, 'title': self.post_title(spec), 'cache': cache_status}
+        except RateLimited as e:
+            return {'index': index, 'error': str(e), 'retry_after': e.retry_after}
+        except Exception as e:
+            # Details stay in the server log; the response goes back to the client as-is
+            print(f"Error generating batch item {index}: {e}")
+            ERRORS.inc(stage='batch_item')
+            return {'index': index, 'error': 'Failed to generate post'}
+
+    def send_event(self, event, payload):
+        self.write_chunk(f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode())
+
+    def handle_generate_post_stream(self):
+        """Same request body as /api/generate-post, answered as Server-Sent Events
+
+        Emits "token" events as provider text arrives, then one "done" event
+        carrying the post-processed post and title (or an "error" event).
+        """
+        try:
+            data = self.read_json_body()
+        except Exception as e:
+            print(f"Invalid request body: {e}")
+            self.send_error(400, "Invalid JSON body")
+            return
+        self.apply_body_deadline(data)
+
+        model = data.get('model', 'gemini').lower()
+        word_count = int(data.get('word_count', 80))
+        industry = data.get('industry') or DEFAULT_INDUSTRY
+        tone = data.get('tone') or DEFAULT_TONE
+        use_cache, refresh = self.cache_options(data)
+        cache_key = make_key(data)
+        cached, cache_status = self.cached_post(data, cache_key) if use_cache and not refresh else (None, None)
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('X-Cache', cache_status or ('MISS' if use_cache else 'BYPASS'))
+        self.begin_chunked()
+        self.end_headers()
+
+        tokens = None
         try:
-            url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={GEMINI_API_KEY}"
+            if cached is not None:
+                self.send_event('token', {'text': cached})
+                self.send_event('done', {'post': cached, 'title': self.post_title(data)})
+                return
+
+            if data.get('type') == 'article':
+                prompt = self.article_prompt(data['url'], industry, tone, word_count, bool(data.get('long_article')))
+            else:
+                with STAGE_SECONDS.time(stage='prompt'):
+                    prompt = self.create_topic_prompt(data['topic'], industry, tone, word_count)
+
+            tokens = self.stream_with_fallback(prompt, model)
+            chunks = []
+            for text in tokens:
+                chunks.append(text)
+                self.send_event('token', {'text': text})
+                self.deadline.check()
+
+            raw = ''.join(chunks).strip()
+            with STAGE_SECONDS.time(stage='postprocess'):
+                post = self.ensure_hashtags_and_emojis(raw, data.get('topic'), industry)
+            # Post-processing only appends, so send the additions as a final token
+            if post.startswith(raw) and len(post) > len(raw):
+                self.send_event('token', {'text': post[len(raw):]})
+            if use_cache:
+                RESPONSE_CACHE.set(cache_key, post)
+                SEMANTIC_CACHE.add(data, cache_key)
+            self.send_event('done', {'post': post, 'title': self.post_title(data)})
+        except (BrokenPipeError, ConnectionResetError, RequestCancelled):
+            print("⚠️  Client disconnected during stream")
+            self.close_connection = True
+        except Exception as e:
+            print(f"Error streaming post: {e}")
+            ERRORS.inc(stage='request')
+            try:
+                # Generic on the wire, like batch items; the details above stay in the server log
+                self.send_event('error', {'error': 'Failed to generate post'})
+            except OSError:
+                self.close_connection = True
+        finally:
+            if tokens is not None:
+                tokens.close()
+            if not self.close_connection:
+                try:
+                    self.end_chunked()
+                except OSError:
+                    self.close_connection = True
+
+    def gemini_headers(self):
+        # In a header rather than ?key=, so the key never shows up in exception messages or URL logs
+        return {"x-goog-api-key": GEMINI_API_KEY}
+
+    def call_gemini_api(self, prompt, timeout=None):
+        try:
+            url = f"{GEMINI_MODEL_URL}:generateContent"
             payload = {
                 "contents": [{"parts": [{"text": prompt}]}],
                 "generationConfig": {
@@ -126,9 +879,9 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                     "maxOutputTokens": 400
                 }
             }
-            response = requests.post(url, json=payload)
+            response = provider_client.post(url, headers=self.gemini_headers(), json=payload, timeout=timeout)
             if response.status_code != 200:
-                raise Exception(f"Gemini API error: {response.status_code} - {response.text}")
+                raise ProviderError.from_response('Gemini', response)
             data = response.json()
             if 'candidates' in data and len(data['candidates']) > 0:
                 return data['candidates'][0]['content']['parts'][0]['text'].strip()
@@ -137,10 +890,9 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         except Exception as e:
             raise e
 
-    def call_openrouter_api(self, prompt):
+    def call_openrouter_api(self, prompt, timeout=None):
         if not OPENROUTER_API_KEY:
             raise Exception("OpenRouter API key not configured")
-        url = "https://openrouter.ai/api/v1/generate"
         headers = {
             "Authorization": f"Bearer {OPENROUTER_API_KEY}",
             "Content-Type": "application/json"
@@ -149,62 +901,329 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             "model": "openai/gpt-3.5-turbo",
             "messages": [{"role": "user", "content": prompt}]
         }
-        response = requests.post(url, headers=headers, json=payload)
+        response = provider_client.post(OPENROUTER_CHAT_URL, headers=headers, json=payload, timeout=timeout)
         if response.status_code != 200:
-            raise Exception(f"OpenRouter API error: {response.status_code} - {response.text}")
+            raise ProviderError.from_response('OpenRouter', response)
         data = response.json()
         if 'choices' in data and len(data['choices']) > 0:
             return data['choices'][0]['message']['content'].strip()
         else:
             raise Exception("No response from OpenRouter API")
 
-    def generate_post_from_topic(self, topic, industry, tone, model='gemini', word_count=80):
-        prompt = self.create_topic_prompt(topic, industry, tone, word_count)
+    def iter_sse_data(self, response):
+        # SSE is always UTF-8; without a charset requests would decode it as ISO-8859-1
+        response.encoding = 'utf-8'
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith('data:'):
+                payload = line[5:].strip()
+                if payload == '[DONE]':
+                    return
+                yield json.loads(payload)
+
+    def stream_gemini_api(self, prompt, timeout=None):
+        url = f"{GEMINI_MODEL_URL}:streamGenerateContent?alt=sse"
+        payload = {
+            "contents": [{"parts": [{"text": prompt}]}],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 400
+            }
+        }
+        response = provider_client.post(url, headers=self.gemini_headers(), json=payload, stream=True, timeout=timeout)
         try:
-            if model == 'openrouter':
-                return self.call_openrouter_api(prompt)
-            return self.call_gemini_api(prompt)
-        except Exception as e:
-            print(f"Primary model failed, trying fallback: {e}")
-            if model == 'openrouter':
-                return self.call_gemini_api(prompt)
-            return self.call_openrouter_api(prompt)
+            if response.status_code != 200:
+                raise ProviderError.from_response('Gemini', response)
+            for data in self.iter_sse_data(response):
+                for candidate in data.get('candidates', [])[:1]:
+                    for part in candidate.get('content', {}).get('parts', []):
+                        if part.get('text'):
+                            yield part['text']
+        finally:
+            response.close()
 
-    def generate_post_from_article(self, url, industry, tone, model='gemini', word_count=80):
+    def stream_openrouter_api(self, prompt, timeout=None):
+        if not OPENROUTER_API_KEY:
+            raise Exception("OpenRouter API key not configured")
+        headers = {
+            "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+            "Content-Type": "application/json"
+        }
+        payload = {
+            "model": "openai/gpt-3.5-turbo",
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True
+        }
+        response = provider_client.post(OPENROUTER_CHAT_URL, headers=headers, json=payload, stream=True, timeout=timeout)
         try:
+            if response.status_code != 200:
+                raise ProviderError.from_response('OpenRouter', response)
+            for data in self.iter_sse_data(response):
+                for choice in data.get('choices', [])[:1]:
+                    text = (choice.get('delta') or {}).get('content')
+                    if text:
+                        yield text
+        finally:
+            response.close()
+
+    def stream_with_fallback(self, prompt, model='gemini'):
+        """Yield text chunks from the primary provider, switching to the fallback
+        only if the primary fails before producing any output"""
+        streams = {'gemini': self.stream_gemini_api, 'openrouter': self.stream_openrouter_api}
+        names = self.provider_order(model)
+        if len(names) > 1 and not BREAKERS[names[0]].available():
+            names.reverse()
+        fallback = names[-1]
+        for name in names:
+            breaker = BREAKERS[name]
+            timeout = self.deadline.timeout(PRIMARY_DEADLINE_SHARE if name != fallback else 1.0)
             try:
-                article_data = self.extract_article_content(url)
-                prompt = self.create_article_prompt(article_data, industry, tone, word_count)
-            except Exception as extraction_error:
-                prompt = f"Summarize the article at this URL for a LinkedIn post: {url}\nIndustry: {industry}\nTone: {tone}\nLimit the post to about {word_count} words. Include emojis, a call-to-action, and at least 3 relevant hashtags."
+                probe = breaker.acquire()
+            except CircuitOpenError:
+                if name == fallback:
+                    raise
+                continue
+            stream = streams[name](prompt, timeout=timeout)
+            started = False
+            outcome = None
+            start = time.monotonic()
+            PROVIDER_IN_FLIGHT.inc(provider=name)
             try:
-                if model == 'openrouter':
-                    return self.call_openrouter_api(prompt)
-                return self.call_gemini_api(prompt)
+                for text in stream:
+                    started = True
+                    yield text
+                outcome = 'ok'
             except Exception as e:
+                outcome = 'error'
+                if is_timeout(e):
+                    breaker.record_timeout(time.monotonic() - start, timeout, probe)
+                else:
+                    breaker.record_failure(time.monotonic() - start, probe)
+                PROVIDER_SECONDS.observe(time.monotonic() - start, provider=name, outcome='error')
+                ERRORS.inc(stage=f'provider_{name}')
+                if started or name == fallback:
+                    raise
                 print(f"Primary model failed, trying fallback: {e}")
-                if model == 'openrouter':
-                    return self.call_gemini_api(prompt)
-                return self.call_openrouter_api(prompt)
-        except Exception as e:
-            raise e
+                continue
+            finally:
+                stream.close()
+                PROVIDER_IN_FLIGHT.dec(provider=name)
+                if outcome is None:
+                    # The consumer stopped reading (disconnect, deadline); hand back a half-open probe
+                    breaker.release(probe)
+            breaker.record_success(time.monotonic() - start, probe)
+            PROVIDER_SECONDS.observe(time.monotonic() - start, provider=name, outcome='ok')
+            return
+
+    def provider_order(self, model='gemini'):
+        """Providers with an API key, the requested model first
+
+        An unconfigured provider is never tried, so it cannot trip its breaker or be hedged to.
+        """
+        order = ['openrouter', 'gemini'] if model == 'openrouter' else ['gemini', 'openrouter']
+        keys = {'gemini': GEMINI_API_KEY, 'openrouter': OPENROUTER_API_KEY}
+        return [name for name in order if keys[name]]
 
-    def extract_article_content(self, url):
+    def call_provider(self, name, prompt, share=1.0):
+        """Run one provider call under its retry policy, circuit breaker and the request deadline"""
+        fn = self.call_gemini_api if name == 'gemini' else self.call_openrouter_api
+        # Fixed up front: retries and their backoff spend this provider's share, never the fallback's
+        budget = self.deadline.child(share)
+
+        def attempt():
+            timeout = budget.timeout()
+            return BREAKERS[name].call(lambda: fn(prompt, timeout=timeout), timeout, (requests.Timeout,))
+
+        start = time.perf_counter()
+        outcome = 'ok'
         try:
-            import newspaper
-            article = newspaper.Article(url)
-            article.download()
-            article.parse()
-            content = article.text.strip()
-            title = article.title.strip() if article.title else 'Article'
-            return {
-                'title': title,
-                'content': content[:2000],
-                'url': url
-            }
+            with PROVIDER_IN_FLIGHT.track(provider=name):
+                return PROVIDER_RETRIES[name].call(attempt, deadline=budget)
+        except CircuitOpenError:
+            outcome = 'short_circuit'
+            raise
+        except requests.Timeout as e:
+            outcome = 'error'
+            ERRORS.inc(stage=f'provider_{name}')
+            remaining = budget.remaining()
+            if remaining is not None and remaining < MIN_CALL_TIMEOUT:
+                raise DeadlineExceeded(f"{name} did not answer within its share of the request deadline") from e
+            raise
+        except Exception:
+            outcome = 'error'
+            ERRORS.inc(stage=f'provider_{name}')
+            raise
+        finally:
+            PROVIDER_SECONDS.observe(time.perf_counter() - start, provider=name, outcome=outcome)
+
+    def call_with_fallback(self, prompt, model='gemini'):
+        names = self.provider_order(model)
+        if len(names) == 1:
+            # Nothing to fall back to or hedge with, so the one provider gets the whole budget
+            return self.call_provider(names[0], prompt)
+        primary, fallback = names
+        # Skip straight to the fallback while the primary's circuit is open
+        if not BREAKERS[primary].available():
+            if not BREAKERS[fallback].available():
+                raise CircuitOpenError("All LLM providers are currently unavailable")
+            print(f"⚡ {primary} circuit open, using {fallback}")
+            primary, fallback = fallback, primary
+        # The primary gets part of the remaining budget so a fallback can still fit
+        return HEDGER.run(
+            primary, lambda: self.call_provider(primary, prompt, PRIMARY_DEADLINE_SHARE),
+            fallback, lambda: self.call_provider(fallback, prompt),
+            deadline=self.deadline
+        )
+
+    def generate_post_from_topic(self, topic, industry, tone, model='gemini', word_count=80):
+        with STAGE_SECONDS.time(stage='prompt'):
+            prompt = self.create_topic_prompt(topic, industry, tone, word_count)
+        return self.call_with_fallback(prompt, model)
+
+    def generate_post_from_article(self, url, industry, tone, model='gemini', word_count=80, long_article=False):
+        prompt = self.article_prompt(url, industry, tone, word_count, long_article)
+        return self.call_with_fallback(prompt, model)
+
+    def article_prompt(self, url, industry, tone, word_count=80, long_article=False):
+        try:
+            article_data = self.extract_article_content(url, full=long_article)
+        except (DeadlineExceeded, RequestCancelled):
+            raise
+        except Exception as extraction_error:
+            ERRORS.inc(stage='extraction')
+            return f"Summarize the article at this URL for a LinkedIn post: {url}\nIndustry: {industry}\nTone: {tone}\nLimit the post to about {word_count} words. Include emojis, a call-to-action, and at least 3 relevant hashtags."
+        summarized = long_article and estimate_tokens(article_data['content']) > LONG_ARTICLE_CHUNK_TOKENS
+        if summarized:
+            article_data = dict(article_data, content=self.summarize_long_article(article_data, word_count))
+        with STAGE_SECONDS.time(stage='prompt'):
+            return self.create_article_prompt(article_data, industry, tone, word_count, summarized)
+
+    def summarize_long_article(self, article_data, word_count=80):
+        """Map-reduce for long articles: summarize chunks concurrently, return the joined summaries
+
+        Chunks go round-robin to the providers whose circuits are closed, at most
+        LONG_ARTICLE_WORKERS at a time across all requests. Each chunk summary is
+        cached by its prompt, so a repeat request only pays for chunks that failed.
+        Chunks that fail or miss the map deadline fall back to a local extractive summary.
+        """
+        chunks = chunk_text(article_data['content'], LONG_ARTICLE_CHUNK_TOKENS, LONG_ARTICLE_MAX_CHUNKS)
+        providers = [name for name, breaker in BREAKERS.items() if breaker.available()] or list(BREAKERS)
+        chunk_words = max(40, 2 * word_count // len(chunks))
+        summaries = [None] * len(chunks)
+        futures = {}
+        for index, chunk in enumerate(chunks):
+            prompt = self.create_chunk_prompt(article_data['title'], chunk, index, len(chunks), chunk_words)
+            key = 'chunk|' + hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+            cached = CHUNK_CACHE.get(key)
+            if cached is not None:
+                CHUNK_SUMMARIES.inc(source='cache')
+                summaries[index] = cached
+            else:
+                futures[CHUNK_EXECUTOR.submit(self.summarize_chunk, key, prompt, providers[index % len(providers)])] = index
+
+        if futures:
+            with STAGE_SECONDS.time(stage='map'):
+                try:
+                    for future in as_completed(futures, timeout=self.deadline.timeout(LONG_ARTICLE_MAP_SHARE)):
+                        try:
+                            summaries[futures[future]] = future.result()
+                            CHUNK_SUMMARIES.inc(source='provider')
+                        except (DeadlineExceeded, RequestCancelled):
+                            raise
+                        except Exception as e:
+                            print(f"⚠️  Chunk {futures[future] + 1}/{len(chunks)} summary failed: {e}")
+                except TimeoutError:
+                    # Stragglers keep running and fill the chunk cache for the next request
+                    print("⚠️  Long-article map phase ran out of time")
+        self.deadline.check()
+
+        for index, chunk in enumerate(chunks):
+            if summaries[index] is None:
+                CHUNK_SUMMARIES.inc(source='local')
+                summaries[index] = summarize(chunk, chunk_words * 4 // 3)
+        return '\n'.join(summaries)
+
+    def summarize_chunk(self, key, prompt, provider):
+        summary = self.call_with_fallback(prompt, provider).strip()
+        CHUNK_CACHE.set(key, summary)
+        return summary
+
+    def extract_article_content(self, url, full=False):
+        canonical_url = canonicalize_url(url)
+        text_target = LONG_ARTICLE_TEXT_TARGET if full else article_fetcher.ARTICLE_TEXT_TARGET
+        flight_key = canonical_url + ('|full' if full else '')
+        with STAGE_SECONDS.time(stage='extraction'):
+            return EXTRACTION_FLIGHTS.do(flight_key, lambda: self.fetch_article(url, canonical_url, text_target), self.deadline)
+
+    def fetch_article(self, url, canonical_url, text_target=article_fetcher.ARTICLE_TEXT_TARGET):
+        cached = ARTICLE_CACHE.get(canonical_url)
+        # An entry cut short at a smaller text target cannot serve a long-article request
+        usable = cached if cached and (text_target <= article_fetcher.ARTICLE_TEXT_TARGET or ARTICLE_CACHE.covers(cached, text_target)) else None
+        if usable and ARTICLE_CACHE.is_fresh(usable):
+            ARTICLE_LOOKUPS.inc(result='fresh')
+            return self.article_result(usable, url)
+        try:
+            headers = {'User-Agent': ARTICLE_USER_AGENT}
+            if usable and usable.get('etag'):
+                headers['If-None-Match'] = usable['etag']
+            if usable and usable.get('last_modified'):
+                headers['If-Modified-Since'] = usable['last_modified']
+            timeout = self.deadline.timeout(EXTRACTION_DEADLINE_SHARE, cap=ARTICLE_FETCH_TIMEOUT)
+            result = article_fetcher.fetch_article(url, headers=headers, timeout=timeout, deadline=self.deadline,
+                                                   text_target=text_target)
+            if result.status == 304 and usable:
+                ARTICLE_LOOKUPS.inc(result='revalidated')
+                return self.article_result(ARTICLE_CACHE.touch(canonical_url, usable), url)
+            if result.status != 200:
+                raise Exception(f"Article fetch failed: {result.status}")
+            ARTICLE_FETCH_BYTES.observe(result.bytes_read, truncated=str(result.truncated).lower())
+
+            title, content, backend = result.title or 'Article', result.text, 'stream'
+            try:
+                with STAGE_SECONDS.time(stage='parse_html'):
+                    if EXTRACTION_POOL.enabled:
+                        extracted = EXTRACTION_POOL.extract(result.html, url, timeout=self.deadline.timeout(cap=EXTRACTION_POOL.task_timeout))
+                    else:
+                        extracted = EXTRACTION_ENGINE.extract(result.html, url)
+                # Prefer the scored extraction unless the streamed paragraphs found clearly more
+                if len(extracted['content']) >= ARTICLE_MIN_TEXT or len(extracted['content']) > len(content):
+                    title, content, backend = extracted['title'] or title, extracted['content'], extracted['backend']
+            except ExtractionError as e:
+                print(f"⚠️  Extraction failed for {canonical_url}: {e}")
+            EXTRACTIONS.inc(backend=backend)
+            if not content:
+                raise Exception("No article text found")
+            entry = ARTICLE_CACHE.put(
+                canonical_url, title, content,
+                etag=result.headers.get('ETag'),
+                last_modified=result.headers.get('Last-Modified'),
+                truncated=result.truncated,
+                text_target=text_target
+            )
+            ARTICLE_LOOKUPS.inc(result='fetched')
+            return self.article_result(entry, url)
+        except (DeadlineExceeded, RequestCancelled):
+            raise
         except Exception as e:
+            if cached:
+                ARTICLE_LOOKUPS.inc(result='stale')
+                print(f"⚠️  Serving stale article for {canonical_url}: {e}")
+                return self.article_result(cached, url)
             raise Exception('Failed to extract article content.')
 
+    def article_result(self, entry, url):
+        return {
+            'title': entry['title'],
+            'content': entry['content'],
+            'url': url
+        }
+
+    def create_chunk_prompt(self, title, chunk, index, total, word_limit):
+        return f'''Summarize section {index + 1} of {total} of the article "{title}" in at most {word_limit} words.
+Keep the key facts, figures, names and conclusions. Write plain sentences with no preamble.
+
+Section text:
+{chunk}'''
+
     def get_tone_instruction(self, tone):
         tone_map = {
             'professional': 'Maintain a formal, knowledgeable, and trustworthy voice.',
@@ -232,8 +1251,15 @@ Instructions:
 
 Now write the post:'''
 
-    def create_article_prompt(self, article_data, industry, tone, word_count=80):
+    def create_article_prompt(self, article_data, industry, tone, word_count=80, summarized=False):
+        """summarized: content is already the map-reduce chunk summaries, which are
+        kept whole; trimming them again would favour the article's opening chunks"""
         tone_instruction = self.get_tone_instruction(tone)
+        if summarized:
+            content = article_data['content']
+        else:
+            with STAGE_SECONDS.time(stage='summarize'):
+                content = summarize(article_data['content'])
         return f'''Summarize the following article into a scroll-stopping, SEO-friendly LinkedIn post.
 
 Title: {article_data['title']}
@@ -241,7 +1267,7 @@ Industry: {industry}
 Tone: {tone_instruction}
 
 Article content:
-{article_data['content'][:1500]}
+{content}
 
 Post requirements:
 - Open with a striking insight, quote, or statistic
@@ -254,11 +1280,27 @@ Post requirements:
 
 Now write the LinkedIn post:'''
 
-def main():
-    os.chdir(DIRECTORY)
-    with socketserver.TCPServer((HOST, PORT), CustomHTTPRequestHandler) as httpd:
-        print(f"🚀 LinkedIn AI Post Generator Server Running at http://{HOST}:{PORT}")
-        if not os.environ.get('RAILWAY_ENVIRONMENT'):
+def serve(worker_index=None):
+    """Run one HTTP server process until interrupted or sent SIGTERM
+
+    worker_index is set for pre-forked workers, which bind with SO_REUSEPORT.
+    """
+    if worker_index is not None:
+        # Each worker keeps its own counters; the label keeps their series apart in Prometheus
+        REGISTRY.label_all(worker=worker_index)
+        # ADMISSION was built before the fork, so every worker would otherwise allow the full limits
+        ADMISSION.scale(1 / WEB_WORKERS)
+    with PooledHTTPServer((HOST, PORT), CustomHTTPRequestHandler, reuse_port=worker_index is not None) as httpd:
+        REGISTRY.callback_gauge('linkedin_http_queue_depth', 'Connections waiting for a worker thread', lambda: httpd.queue_depth)
+        REGISTRY.callback_gauge('linkedin_http_connections_active', 'Connections accepted and not yet finished', lambda: httpd.pending)
+        # shutdown() blocks until serve_forever returns, so it cannot run inside the handler itself
+        signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=httpd.shutdown, daemon=True).start())
+        if worker_index is None:
+            print(f"🚀 LinkedIn AI Post Generator Server Running at http://{HOST}:{PORT}")
+        else:
+            print(f"🚀 Worker {worker_index} (pid {os.getpid()}) serving http://{HOST}:{PORT}")
+        print(f"🧵 {httpd.workers} worker threads, up to {MAX_QUEUED_REQUESTS} queued requests")
+        if not worker_index and not os.environ.get('RAILWAY_ENVIRONMENT'):
             try:
                 webbrowser.open(f'http://localhost:{PORT}')
                 print("✅ Browser opened automatically")
@@ -270,6 +1312,18 @@ def main():
             print("\n🛑 Server stopped")
         except Exception as e:
             print(f"\n❌ Error: {e}")
+        finally:
+            EXTRACTION_POOL.close()
+
+def main():
+    os.chdir(DIRECTORY)
+    if WEB_WORKERS > 1:
+        if reuse_port_supported():
+            # New connections made after fork must not reuse the parent's pooled sockets
+            Supervisor(WEB_WORKERS, serve, after_fork=provider_client.reset_session).run()
+            return
+        print("⚠️  SO_REUSEPORT/fork not available here, running a single process")
+    serve()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,248 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+
+# Well under Docker's default 64 MB /dev/shm, which other processes may also be using
+SHARED_CACHE_MB = int(os.environ.get('SHARED_CACHE_MB', 16))
+SHARED_CACHE_SLOT_BYTES = int(os.environ.get('SHARED_CACHE_SLOT_BYTES', 4096))
+SHARED_CACHE_PATH = os.environ.get('SHARED_CACHE_PATH')
+WAYS = 4
+THREAD_LOCK_STRIPES = 64
+COMPRESS_MIN_BYTES = 256
+
+MAGIC = b'LPGSHC02'
+# magic, sets, slot size
+HEADER = struct.Struct('!8sII')
+HEADER_SIZE = 64
+# Each set starts with its own hits, misses, stores and evictions, updated under the set's lock
+COUNTERS = struct.Struct('!QQQQ')
+HITS, MISSES, STORES, EVICTIONS = range(4)
+# key hash (0 = empty), expires_at, last access, key length, value length, flags
+SLOT = struct.Struct('!QddHIB')
+FLAG_JSON = 1
+FLAG_ZLIB = 2
+FLAG_BYTES = 4
+
+
+class SharedCacheUnavailable(OSError):
+    pass
+
+
+def _key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big') | 1
+
+
+class SharedCache:
+    """Fixed-size hash table in a memory-mapped file, shared by forked workers
+
+    The table is set-associative: a key hashes to one set of WAYS slots and
+    evicts the least recently used of them when the set is full. Each set is
+    guarded by an fcntl byte-range lock, which the kernel drops if a worker
+    dies holding it, plus an in-process thread lock because fcntl locks do not
+    exclude threads of the same process. Values are JSON (or str), zlib
+    compressed when that helps, or bytes stored as given; values too large
+    for a slot are not stored. Hit, miss, store and eviction counts are kept
+    per set, so counting takes no lock beyond the set's own.
+
+    Pages of a tmpfs file are only allocated when first written, and writing
+    past a full /dev/shm kills the process with SIGBUS; the table is therefore
+    refused (SharedCacheUnavailable) unless its filesystem has room for all of it.
+
+    With no path the file is created and immediately unlinked, so only this
+    process and the workers forked from it can see it.
+    """
+
+    def __init__(self, size_mb=SHARED_CACHE_MB, slot_bytes=SHARED_CACHE_SLOT_BYTES, path=SHARED_CACHE_PATH, ttl=3600):
+        self.slot_bytes = slot_bytes
+        self.set_bytes = COUNTERS.size + WAYS * slot_bytes
+        self.sets = max(1, (size_mb * 1024 * 1024) // self.set_bytes)
+        self.ttl = ttl
+        self.size = HEADER_SIZE + self.sets * self.set_bytes
+        if path:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        else:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            self.fd, tmp = tempfile.mkstemp(prefix='linkedin-cache-', dir=directory)
+            os.unlink(tmp)
+        self._thread_locks = [threading.Lock() for _ in range(THREAD_LOCK_STRIPES)]
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            self._check_space()
+            if os.fstat(self.fd).st_size != self.size:
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, self.size)
+            self.map = mmap.mmap(self.fd, self.size)
+            magic, sets, slot_size = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC or sets != self.sets or slot_size != slot_bytes:
+                self.map[:self.size] = bytes(self.size)
+                HEADER.pack_into(self.map, 0, MAGIC, self.sets, slot_bytes)
+        except BaseException:
+            os.close(self.fd)
+            raise
+        finally:
+            try:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+            except OSError:
+                pass
+
+    def _check_space(self):
+        # Blocks the file already holds count as room; the rest must still be free
+        vfs = os.fstatvfs(self.fd)
+        available = vfs.f_bavail * vfs.f_frsize + os.fstat(self.fd).st_blocks * 512
+        if available < self.size:
+            raise SharedCacheUnavailable(
+                f"{self.size // (1024 * 1024)} MB shared cache does not fit: {available // (1024 * 1024)} MB free")
+
+    def _set_offset(self, index):
+        return HEADER_SIZE + index * self.set_bytes
+
+    def _slot_offset(self, index, way):
+        return self._set_offset(index) + COUNTERS.size + way * self.slot_bytes
+
+    def _count(self, index, field):
+        # Caller holds the set's lock
+        offset = self._set_offset(index) + 8 * field
+        struct.pack_into('!Q', self.map, offset, struct.unpack_from('!Q', self.map, offset)[0] + 1)
+
+    def get(self, key):
+        key_bytes = key.encode('utf-8')
+        key_hash = _key_hash(key)
+        index = key_hash % self.sets
+        now = time.time()
+        found = None
+        with _SetLock(self, index):
+            for way in range(WAYS):
+                offset = self._slot_offset(index, way)
+                slot_hash, expires_at, _, key_len, value_len, flags = SLOT.unpack_from(self.map, offset)
+                if slot_hash != key_hash:
+                    continue
+                start = offset + SLOT.size
+                if self.map[start:start + key_len] != key_bytes:
+                    continue
+                if expires_at <= now:
+                    SLOT.pack_into(self.map, offset, 0, 0.0, 0.0, 0, 0, 0)
+                    break
+                struct.pack_into('!d', self.map, offset + 16, now)
+                found = (self.map[start + key_len:start + key_len + value_len], flags)
+                break
+            self._count(index, HITS if found else MISSES)
+        if found is None:
+            return None
+        data, flags = found
+        try:
+            if flags & FLAG_BYTES:
+                return bytes(data)
+            if flags & FLAG_ZLIB:
+                data = zlib.decompress(data)
+            return json.loads(data) if flags & FLAG_JSON else data.decode('utf-8')
+        except (zlib.error, ValueError):
+            self.delete(key)
+            return None
+
+    def set(self, key, value, ttl=None):
+        key_bytes = key.encode('utf-8')
+        if isinstance(value, bytes):
+            # Callers passing bytes have already serialized (and compressed) them
+            data, flags = value, FLAG_BYTES
+        elif isinstance(value, str):
+            data, flags = value.encode('utf-8'), 0
+        else:
+            data, flags = json.dumps(value).encode('utf-8'), FLAG_JSON
+        if len(data) >= COMPRESS_MIN_BYTES and not flags & FLAG_BYTES:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                data, flags = packed, flags | FLAG_ZLIB
+        if SLOT.size + len(key_bytes) + len(data) > self.slot_bytes or len(key_bytes) > 0xFFFF:
+            return False
+
+        key_hash = _key_hash(key)
+        index = key_hash % self.sets
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        evicted = False
+        with _SetLock(self, index):
+            # Overwrite the key's own slot, else a free or expired one, else the least recently used
+            same, free, oldest = None, None, None
+            for way in range(WAYS):
+                offset = self._slot_offset(index, way)
+                slot_hash, slot_expires, accessed_at, key_len, _, _ = SLOT.unpack_from(self.map, offset)
+                start = offset + SLOT.size
+                if slot_hash == key_hash and self.map[start:start + key_len] == key_bytes:
+                    same = offset
+                    break
+                if free is None and (slot_hash == 0 or slot_expires <= now):
+                    free = offset
+                if oldest is None or accessed_at < oldest[0]:
+                    oldest = (accessed_at, offset)
+            target = same if same is not None else free
+            if target is None:
+                target, evicted = oldest[1], True
+            # Empty the slot first so a worker killed mid-write leaves a free slot, not a torn value
+            SLOT.pack_into(self.map, target, 0, 0.0, 0.0, 0, 0, 0)
+            start = target + SLOT.size
+            self.map[start:start + len(key_bytes)] = key_bytes
+            self.map[start + len(key_bytes):start + len(key_bytes) + len(data)] = data
+            SLOT.pack_into(self.map, target, key_hash, expires_at, now, len(key_bytes), len(data), flags)
+            self._count(index, STORES)
+            if evicted:
+                self._count(index, EVICTIONS)
+        return True
+
+    def delete(self, key):
+        key_bytes = key.encode('utf-8')
+        key_hash = _key_hash(key)
+        index = key_hash % self.sets
+        with _SetLock(self, index):
+            for way in range(WAYS):
+                offset = self._slot_offset(index, way)
+                slot_hash, _, _, key_len, _, _ = SLOT.unpack_from(self.map, offset)
+                start = offset + SLOT.size
+                if slot_hash == key_hash and self.map[start:start + key_len] == key_bytes:
+                    SLOT.pack_into(self.map, offset, 0, 0.0, 0.0, 0, 0, 0)
+
+    def stats(self):
+        # Read without locks; a count bumped meanwhile only shifts the totals by one
+        totals = [0] * 4
+        for index in range(self.sets):
+            for field, value in enumerate(COUNTERS.unpack_from(self.map, self._set_offset(index))):
+                totals[field] += value
+        hits, misses, stores, evictions = totals
+        lookups = hits + misses
+        return {
+            'slots': self.sets * WAYS,
+            'bytes': self.size,
+            'hits': hits,
+            'misses': misses,
+            'stores': stores,
+            'evictions': evictions,
+            'hit_ratio': (hits / lookups) if lookups else 0.0,
+        }
+
+
+class _SetLock:
+    def __init__(self, cache, index):
+        self.cache = cache
+        self.thread_lock = cache._thread_locks[index % THREAD_LOCK_STRIPES]
+        self.length = cache.set_bytes
+        self.offset = cache._set_offset(index)
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.cache.fd, fcntl.LOCK_EX, self.length, self.offset)
+        except BaseException:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, *exc):
+        try:
+            fcntl.lockf(self.cache.fd, fcntl.LOCK_UN, self.length, self.offset)
+        finally:
+            self.thread_lock.release()
@@ -1,4 +1,4 @@
-import requests
+import provider_client
 import json
 import random
 
@@ -44,7 +44,7 @@ Generate the post:"""
 
         try:
             print(f"[DEBUG] Authorization header: Bearer {OPENROUTER_API_KEY}")
-            response = requests.post(
+            response = provider_client.post(
                 self.base_url,
                 headers=self.headers,
                 json={
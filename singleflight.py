@@ -0,0 +1,77 @@
+import threading
+
+WAIT_POLL_SECONDS = 0.1
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution
+
+    The first caller for a key runs fn; callers arriving while it is in
+    flight block and receive the same result (or exception). Exceptions
+    listed in retry_on belong to the leader alone (e.g. its client went
+    away), so waiters that see one run their own fn instead. A waiter passing
+    its own deadline stops waiting when that deadline expires or its client
+    disconnects, without affecting the leader.
+    """
+
+    def __init__(self, name='', retry_on=()):
+        self.name = name
+        self.retry_on = tuple(retry_on)
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+
+    def do(self, key, fn, deadline=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            self._wait(call, deadline)
+            if isinstance(call.error, self.retry_on):
+                return self.do(key, fn, deadline)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _wait(self, call, deadline):
+        if deadline is None:
+            call.done.wait()
+            return
+        while True:
+            deadline.check()
+            remaining = deadline.remaining()
+            step = WAIT_POLL_SECONDS if remaining is None else min(WAIT_POLL_SECONDS, remaining)
+            if call.done.wait(step):
+                return
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._calls)
+        return {'in_flight': in_flight, 'executions': self.executions, 'shared': self.shared}
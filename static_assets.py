@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+STATIC_MAX_CACHED_BYTES = int(os.environ.get('STATIC_MAX_CACHED_BYTES', 1024 * 1024))
+STATIC_MIN_COMPRESS_BYTES = int(os.environ.get('STATIC_MIN_COMPRESS_BYTES', 1024))
+STATIC_IMMUTABLE_MAX_AGE = int(os.environ.get('STATIC_IMMUTABLE_MAX_AGE', 31536000))
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'image/svg+xml', 'application/wasm', 'application/manifest+json')
+# app.3f9a1c2b.js, main-5d41402abc4b2a76.css: a content hash in the name means the file never changes
+HASHED_NAME = re.compile(r'[.\-_][0-9a-f]{8,}\.[a-z0-9]+$', re.I)
+SKIP_DIRS = {'__pycache__', 'node_modules'}
+
+
+class Asset:
+    """One static file: small ones are held in memory with compressed variants"""
+
+    def __init__(self, path, stat):
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        if HASHED_NAME.search(os.path.basename(path)):
+            self.cache_control = f'public, max-age={STATIC_IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            self.cache_control = 'no-cache'
+        self.body = None
+        self.encodings = {}
+        if self.size <= STATIC_MAX_CACHED_BYTES:
+            with open(path, 'rb') as f:
+                self.body = f.read()
+            self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:20] + '"'
+            if self.size >= STATIC_MIN_COMPRESS_BYTES and self.content_type.startswith(COMPRESSIBLE_TYPES):
+                self._compress()
+        else:
+            self.etag = f'"{self.size:x}-{self.mtime_ns:x}"'
+
+    def _compress(self):
+        variants = {'gzip': gzip.compress(self.body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(self.body, quality=11)
+        # Only keep variants that actually save bytes
+        self.encodings = {name: data for name, data in variants.items() if len(data) < self.size * 0.9}
+
+    def stale(self, stat):
+        return stat.st_mtime_ns != self.mtime_ns or stat.st_size != self.size
+
+    def negotiate(self, accept_encoding):
+        """(encoding or None, body bytes or None when the file must be streamed from disk)"""
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        for name in ('br', 'gzip'):
+            if name in self.encodings and name in accepted:
+                return name, self.encodings[name]
+        return None, self.body
+
+    def etag_for(self, encoding):
+        """Strong validator for one representation: compressed bodies differ in bytes, so each gets its own tag"""
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+    def not_modified(self, if_none_match):
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        # Any representation's tag means the client holds the current version of the file
+        current = {self.etag_for(None)} | {self.etag_for(name) for name in self.encodings}
+        return '*' in tags or not tags.isdisjoint(current)
+
+    def not_modified_since(self, if_modified_since):
+        try:
+            return parsedate_to_datetime(if_modified_since).timestamp() >= self.mtime_ns // 1_000_000_000
+        except (TypeError, ValueError, IndexError):
+            return False
+
+
+class StaticAssets:
+    """Index of the files under root, built once at startup and refreshed when a file changes
+
+    Hidden files and directories (.git, .env, caches) are never served.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.realpath(root)
+        self._assets = {}
+        self._lock = threading.Lock()
+        self.build()
+
+    def build(self):
+        assets = {}
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
+            for name in files:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    assets[path] = Asset(path, os.stat(path))
+                except OSError:
+                    continue
+        with self._lock:
+            self._assets = assets
+
+    def resolve(self, url_path):
+        """Filesystem path for a URL path, or None if it falls outside root or is hidden"""
+        path = posixpath.normpath(unquote(urlsplit(url_path).path))
+        parts = [part for part in path.split('/') if part]
+        if any(part.startswith('.') or part in SKIP_DIRS for part in parts):
+            return None
+        full = os.path.realpath(os.path.join(self.root, *parts))
+        if full != self.root and not full.startswith(self.root + os.sep):
+            return None
+        # "/dir" (no slash) stays a directory so the caller can redirect to "/dir/"
+        if url_path.split('?', 1)[0].endswith('/') and os.path.isdir(full):
+            full = os.path.join(full, 'index.html')
+        return full
+
+    def lookup(self, url_path):
+        """Asset for a URL path, re-read if it changed on disk; None if there is no such file"""
+        path = self.resolve(url_path)
+        if path is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._assets.pop(path, None)
+            return None
+        with self._lock:
+            asset = self._assets.get(path)
+        if asset is None or asset.stale(stat):
+            try:
+                asset = Asset(path, stat)
+            except OSError:
+                return None
+            with self._lock:
+                self._assets[path] = asset
+        return asset
+
+    def stats(self):
+        with self._lock:
+            cached = [a for a in self._assets.values() if a.body is not None]
+            return {
+                'files': len(self._assets),
+                'cached_files': len(cached),
+                'cached_bytes': sum(a.size + sum(len(v) for v in a.encodings.values()) for a in cached),
+                'brotli': brotli is not None,
+            }
@@ -0,0 +1,166 @@
+import math
+import os
+import re
+from collections import Counter
+
+SUMMARY_TOKEN_BUDGET = int(os.environ.get('SUMMARY_TOKEN_BUDGET', 350))
+SUMMARY_MAX_SENTENCES = int(os.environ.get('SUMMARY_MAX_SENTENCES', 400))
+TEXTRANK_DAMPING = 0.85
+TEXTRANK_ITERATIONS = 30
+TEXTRANK_TOLERANCE = 1e-4
+MIN_SENTENCE_WORDS = 5
+REDUNDANCY_THRESHOLD = 0.7
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])["”\')\]]?\s+(?=["“(\[]?[A-Z0-9])')
+WORD = re.compile(r"[a-z0-9][a-z0-9'\-]*")
+STOPWORDS = frozenset('''
+a about above after again against all also am an and any are as at be because been before being below between both
+but by can could did do does doing down during each few for from further had has have having he her here hers him
+his how i if in into is it its itself just me more most my no nor not now of off on once only or other our ours out
+over own same she should so some such than that the their theirs them then there these they this those through to
+too under until up very was we were what when where which while who whom why will with would you your yours
+said says one new like get also its it's
+'''.split())
+
+
+def estimate_tokens(text):
+    """Rough LLM token count: about four tokens for every three words"""
+    return (len(text.split()) * 4 + 2) // 3
+
+
+def split_sentences(text):
+    sentences = []
+    for block in (text or '').split('\n'):
+        block = block.strip()
+        if block:
+            sentences.extend(s.strip() for s in SENTENCE_SPLIT.split(block) if s.strip())
+    return sentences
+
+
+def _terms(sentence):
+    return [w for w in WORD.findall(sentence.lower()) if w not in STOPWORDS and len(w) > 2]
+
+
+def _vectors(term_lists):
+    """Unit-length TF-IDF vectors (sparse dicts), IDF taken over the article's own sentences"""
+    doc_freq = Counter()
+    for terms in term_lists:
+        doc_freq.update(set(terms))
+    n = len(term_lists)
+    vectors = []
+    for terms in term_lists:
+        counts = Counter(terms)
+        vector = {t: (1 + math.log(c)) * math.log((1 + n) / (1 + doc_freq[t])) + 1e-9 for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        vectors.append({t: v / norm for t, v in vector.items()})
+    return vectors
+
+
+def _textrank(vectors):
+    """PageRank over the cosine-similarity graph of sentences"""
+    n = len(vectors)
+    # Inverted index so only sentence pairs sharing a term are compared
+    postings = {}
+    for i, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings.setdefault(term, []).append((i, weight))
+    edges = [Counter() for _ in range(n)]
+    for entries in postings.values():
+        for a in range(len(entries)):
+            i, wi = entries[a]
+            for j, wj in entries[a + 1:]:
+                edges[i][j] += wi * wj
+                edges[j][i] += wi * wj
+    out_weight = [sum(e.values()) for e in edges]
+
+    scores = [1.0 / n] * n
+    for _ in range(TEXTRANK_ITERATIONS):
+        updated = []
+        for i in range(n):
+            rank = sum(scores[j] * w / out_weight[j] for j, w in edges[i].items() if out_weight[j])
+            updated.append((1 - TEXTRANK_DAMPING) / n + TEXTRANK_DAMPING * rank)
+        delta = sum(abs(a - b) for a, b in zip(scores, updated))
+        scores = updated
+        if delta < TEXTRANK_TOLERANCE:
+            break
+    return scores
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(t, 0.0) for t, v in a.items())
+
+
+def rank_sentences(sentences):
+    """(scores, vectors): TextRank salience nudged towards the lead and away from fragments"""
+    term_lists = [_terms(s) for s in sentences]
+    vectors = _vectors(term_lists)
+    scores = _textrank(vectors)
+    n = len(sentences)
+    ranked = []
+    for i, (sentence, terms, score) in enumerate(zip(sentences, term_lists, scores)):
+        position = 1.0 + 0.5 * (1 - i / n)
+        if len(sentence.split()) < MIN_SENTENCE_WORDS or not terms:
+            position *= 0.2
+        ranked.append(score * position)
+    return ranked, vectors
+
+
+def summarize(text, token_budget=SUMMARY_TOKEN_BUDGET):
+    """Most salient sentences of text, in their original order, within token_budget
+
+    Text that already fits the budget is returned unchanged.
+    """
+    text = (text or '').strip()
+    if estimate_tokens(text) <= token_budget:
+        return text
+    sentences = split_sentences(text)[:SUMMARY_MAX_SENTENCES]
+    if len(sentences) < 2:
+        words = text.split()
+        return ' '.join(words[:token_budget * 3 // 4])
+
+    scores, vectors = rank_sentences(sentences)
+    chosen, used = [], 0
+    for i in sorted(range(len(sentences)), key=lambda i: -scores[i]):
+        cost = estimate_tokens(sentences[i])
+        if used + cost > token_budget:
+            continue
+        # Skip near-repeats of a sentence already picked (pull quotes, summaries of the lead)
+        if not any(_cosine(vectors[i], vectors[j]) > REDUNDANCY_THRESHOLD for j in chosen):
+            chosen.append(i)
+            used += cost
+    if not chosen:
+        words = sentences[max(range(len(sentences)), key=lambda i: scores[i])].split()
+        return ' '.join(words[:token_budget * 3 // 4])
+    return ' '.join(sentences[i] for i in sorted(chosen))
+
+
+def chunk_text(text, chunk_tokens, max_chunks=None):
+    """Split text into sentence-aligned chunks of about chunk_tokens tokens
+
+    With max_chunks set, chunks grow as needed so there are never more than that.
+    """
+    sentences = split_sentences(text)
+    costs = [estimate_tokens(sentence) for sentence in sentences]
+    if max_chunks:
+        chunk_tokens = max(chunk_tokens, -(-sum(costs) // max_chunks))
+    chunks = _pack(sentences, costs, chunk_tokens)
+    # Sentences never split, so greedy packing can spill past max_chunks; widen and repack until it fits
+    while max_chunks and len(chunks) > max_chunks:
+        chunk_tokens += max(1, chunk_tokens // 10)
+        chunks = _pack(sentences, costs, chunk_tokens)
+    return chunks
+
+
+def _pack(sentences, costs, chunk_tokens):
+    chunks, current, used = [], [], 0
+    for sentence, cost in zip(sentences, costs):
+        if current and used + cost > chunk_tokens:
+            chunks.append(' '.join(current))
+            current, used = [], 0
+        current.append(sentence)
+        used += cost
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Checks for admission.AdmissionController; runs offline, no API keys needed
+
+Usage: python test_admission.py   (or python -m pytest test_admission.py)
+"""
+
+import time
+
+from admission import AdmissionController, RateLimited
+
+
+def make_controller():
+    return AdmissionController(rate=0, client_rate=10, client_burst=2, max_wait=0.05)
+
+
+def test_burst_then_reject():
+    controller = make_controller()
+    controller.admit('ip:1')
+    controller.admit('ip:1')
+    try:
+        controller.admit('ip:1')
+        assert False, 'admitted past the burst'
+    except RateLimited as e:
+        assert e.reason == 'client'
+    # Other clients have their own bucket
+    controller.admit('ip:2')
+
+
+def test_longer_max_wait_paces_instead_of_rejecting():
+    controller = make_controller()
+    start = time.monotonic()
+    # Like a batch: every item is charged, but may wait out the batch's deadline
+    for _ in range(8):
+        controller.admit('ip:1', max_wait=5)
+    elapsed = time.monotonic() - start
+    assert 0.5 <= elapsed < 1.5, elapsed
+    assert controller.stats()['rejected']['client'] == 0
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
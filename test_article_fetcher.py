@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Checks for article_fetcher.fetch_article against a local HTTP server; runs offline
+
+Usage: python test_article_fetcher.py   (or python -m pytest test_article_fetcher.py)
+"""
+
+import http.server
+import threading
+import time
+
+import article_fetcher
+from deadline import Deadline, DeadlineExceeded
+
+DRIP_SECONDS = 0.5
+
+
+class DripHandler(http.server.BaseHTTPRequestHandler):
+    """Sends a page one byte at a time, each well within any per-read timeout"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'<html><body>' + b'<p>' + b'Slow article text, one byte at a time. ' * 50 + b'</p></body></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if self.path == '/close':
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        try:
+            for i in range(len(body)):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                time.sleep(DRIP_SECONDS)
+        except OSError:
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), DripHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_slow_drip_stops_at_deadline(path):
+    server = start_server()
+    try:
+        start = time.monotonic()
+        try:
+            article_fetcher.fetch_article(f'http://127.0.0.1:{server.server_address[1]}{path}',
+                                          timeout=5, deadline=Deadline(1))
+            assert False, 'slow page fetched past its deadline'
+        except DeadlineExceeded:
+            pass
+        assert time.monotonic() - start < 1 + 2 * DRIP_SECONDS
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_slow_drip_stops_at_deadline():
+    check_slow_drip_stops_at_deadline('/')
+
+
+def test_slow_drip_with_connection_close_stops_at_deadline():
+    check_slow_drip_stops_at_deadline('/close')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Checks for the cache_backends L2 backends; runs offline, no API keys needed
+
+The redis backend talks to mock_redis.py started on an ephemeral port.
+
+Usage: python test_cache_backends.py   (or python -m pytest test_cache_backends.py)
+"""
+
+import tempfile
+import threading
+import time
+
+from cache_backends import DiskBackend, MemoryBackend, NamespacedCache, RedisBackend, SharedMemoryBackend
+from mock_redis import RespServer
+from response_cache import ResponseCache
+
+TTL = 0.2
+
+
+def start_mock_redis():
+    server = RespServer(('127.0.0.1', 0))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def check_round_trip(backend):
+    assert backend.get('missing') is None
+    backend.set('key', b'value', 60)
+    assert backend.get('key') == b'value'
+    backend.set('key', b'replaced', 60)
+    assert backend.get('key') == b'replaced'
+    backend.delete('key')
+    assert backend.get('key') is None
+
+
+def check_ttl_expiry(backend):
+    backend.set('short', b'gone soon', TTL)
+    backend.set('long', b'still here', 60)
+    assert backend.get('short') == b'gone soon'
+    time.sleep(TTL * 1.5)
+    assert backend.get('short') is None
+    assert backend.get('long') == b'still here'
+
+
+def check_namespaced_values(backend):
+    posts = NamespacedCache('posts', backend, 60)
+    articles = NamespacedCache('articles', backend, 60)
+    large = {'title': 'Remote work', 'content': 'Teams ship faster when they write things down. ' * 50}
+    posts.set('same-key', 'A post with emoji 🚀')
+    articles.set('same-key', large)
+    assert posts.get('same-key') == 'A post with emoji 🚀'
+    assert articles.get('same-key') == large
+
+
+def backends():
+    yield MemoryBackend()
+    with tempfile.TemporaryDirectory() as directory:
+        yield DiskBackend(directory)
+    yield SharedMemoryBackend()
+    server = start_mock_redis()
+    try:
+        yield RedisBackend(f'redis://127.0.0.1:{server.server_address[1]}/0')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_round_trip():
+    for backend in backends():
+        check_round_trip(backend)
+
+
+def test_ttl_expiry():
+    for backend in backends():
+        check_ttl_expiry(backend)
+
+
+def test_namespaced_values():
+    for backend in backends():
+        check_namespaced_values(backend)
+
+
+def test_l1_refill_keeps_remaining_l2_ttl():
+    cache = ResponseCache(ttl=60, l2=NamespacedCache('posts', MemoryBackend(), 60))
+    cache.set('key', 'post', ttl=TTL * 2)
+    time.sleep(TTL)
+    cache.clear()
+    assert cache.get('key') == 'post'
+    time.sleep(TTL * 1.5)
+    # Refilled with what the L2 entry had left, not a fresh full TTL
+    assert cache.get('key') is None
+
+
+def test_redis_outage_turns_into_misses():
+    server = start_mock_redis()
+    backend = RedisBackend(f'redis://127.0.0.1:{server.server_address[1]}/0')
+    backend.set('key', b'value', 60)
+    assert backend.get('key') == b'value'
+    server.shutdown()
+    server.server_close()
+    # Pooled connections stay open after shutdown(); start from fresh ones
+    while not backend._pool.empty():
+        backend._pool.get_nowait()[0].close()
+    assert backend.get('key') is None
+    assert backend.stats()['errors'] == 1
+    assert backend.stats()['available'] is False
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
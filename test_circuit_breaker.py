@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Checks for circuit_breaker.CircuitBreaker; runs offline, no API keys needed
+
+Usage: python test_circuit_breaker.py   (or python -m pytest test_circuit_breaker.py)
+"""
+
+import time
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, HALF_OPEN, OPEN
+
+OPEN_SECONDS = 0.1
+
+
+def make_breaker():
+    return CircuitBreaker('test', min_calls=2, failure_rate=0.5, open_seconds=OPEN_SECONDS, half_open_probes=1)
+
+
+def trip(breaker):
+    for _ in range(2):
+        breaker.record_failure(0.01, breaker.acquire())
+    assert breaker.state == OPEN
+
+
+def test_pre_trip_call_does_not_decide_half_open():
+    breaker = make_breaker()
+    # Let through while closed, still running when the circuit trips
+    early = breaker.acquire()
+    assert early is None
+    trip(breaker)
+    time.sleep(OPEN_SECONDS * 1.5)
+    assert breaker.state == HALF_OPEN
+    probe = breaker.acquire()
+    assert probe is not None
+
+    breaker.record_success(0.01, early)
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure(0.01, early)
+    assert breaker.state == HALF_OPEN
+    # The real probe still holds the only slot, and its outcome decides
+    try:
+        breaker.acquire()
+        assert False, 'second probe let through'
+    except CircuitOpenError:
+        pass
+    breaker.record_success(0.01, probe)
+    assert breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(OPEN_SECONDS * 1.5)
+    breaker.record_failure(0.01, breaker.acquire())
+    assert breaker.state == OPEN
+
+
+def test_released_probe_frees_its_slot():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(OPEN_SECONDS * 1.5)
+    probe = breaker.acquire()
+    assert not breaker.available()
+    breaker.release(probe)
+    assert breaker.available()
+    assert breaker.state == HALF_OPEN
+
+
+
+def timed_out():
+    raise TimeoutError('read timed out')
+
+
+def test_short_client_deadlines_leave_breaker_closed():
+    breaker = make_breaker()
+    for _ in range(20):
+        try:
+            # A 0.1s socket timeout only reflects the client's X-Request-Timeout
+            breaker.call(timed_out, timeout=0.1, timeout_errors=(TimeoutError,))
+        except TimeoutError:
+            pass
+    assert breaker.state == CLOSED
+    assert breaker.snapshot()['window_calls'] == 0
+
+
+def test_timeouts_with_full_budget_open_breaker():
+    breaker = make_breaker()
+    for _ in range(2):
+        try:
+            breaker.call(timed_out, timeout=breaker.slow_call_seconds, timeout_errors=(TimeoutError,))
+        except TimeoutError:
+            pass
+    assert breaker.state == OPEN
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Checks for semantic_cache near-duplicate matching; runs offline, no API keys needed
+
+Usage: python test_semantic_cache.py   (or python -m pytest test_semantic_cache.py)
+"""
+
+from response_cache import ResponseCache, make_key
+from semantic_cache import SemanticCache, topic_terms
+
+DISTINCT_INTENTS = [
+    ("The future of remote work", "Tips for remote work"),
+    ("Impact of AI on jobs", "AI jobs guide"),
+    ("Why startups fail", "How startups fail"),
+    ("Python vs Java", "Python and Java"),
+    ("Role of data in marketing", "Importance of data in marketing"),
+    ("Remote work trends", "Remote work"),
+]
+
+
+def cache_with(topic):
+    posts = ResponseCache()
+    cache = SemanticCache(posts, threshold=0.8, enabled=True)
+    data = {'topic': topic}
+    posts.set(make_key(data), f"Post about {topic}")
+    cache.add(data, make_key(data))
+    return cache
+
+
+def test_distinct_intents_have_different_terms():
+    for a, b in DISTINCT_INTENTS:
+        assert topic_terms(a) != topic_terms(b), (a, b)
+
+
+def test_distinct_intents_do_not_match():
+    for a, b in DISTINCT_INTENTS:
+        assert cache_with(a).lookup({'topic': b}) is None, (a, b)
+        assert cache_with(b).lookup({'topic': a}) is None, (b, a)
+
+
+def test_rephrased_topic_matches():
+    match = cache_with("Remote work tips for startups").lookup({'topic': "Remote work tip for a startup"})
+    assert match is not None
+    assert match[0] == "Post about Remote work tips for startups"
+    match = cache_with("AI in healthcare").lookup({'topic': "AI for healthcare industry"})
+    assert match is not None
+    assert match[0] == "Post about AI in healthcare"
+
+
+def test_similar_hit_is_not_counted_as_an_exact_hit():
+    cache = cache_with("Remote work tips for startups")
+    assert cache.lookup({'topic': "Remote work tip for a startup"}) is not None
+    assert cache.response_cache.stats()['hits'] == 0
+    assert cache.stats()['hits'] == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Checks for summarizer.chunk_text; runs offline, no API keys needed
+
+Usage: python test_summarizer.py   (or python -m pytest test_summarizer.py)
+"""
+
+import random
+
+from summarizer import chunk_text, estimate_tokens, split_sentences
+
+
+def make_article(sentence_count, seed):
+    rng = random.Random(seed)
+    words = ['growth', 'teams', 'pipeline', 'market', 'hiring', 'product', 'revenue', 'customers', 'launch']
+    return ' '.join(' '.join(rng.choice(words) for _ in range(rng.randint(4, 60))).capitalize() + '.'
+                    for _ in range(sentence_count))
+
+
+def test_chunk_text_never_exceeds_max_chunks():
+    for seed in range(200):
+        text = make_article(random.Random(seed).randint(20, 400), seed)
+        for chunk_tokens, max_chunks in ((900, 8), (300, 3), (50, 12), (2000, 1)):
+            chunks = chunk_text(text, chunk_tokens, max_chunks)
+            assert 1 <= len(chunks) <= max_chunks, (seed, chunk_tokens, max_chunks, len(chunks))
+
+
+def test_chunk_text_keeps_every_sentence_in_order():
+    text = make_article(300, 7)
+    chunks = chunk_text(text, 900, 8)
+    assert [s for chunk in chunks for s in split_sentences(chunk)] == split_sentences(text)
+
+
+def test_chunk_text_respects_chunk_tokens_without_limit():
+    text = make_article(300, 11)
+    chunks = chunk_text(text, 900)
+    assert len(chunks) > 8
+    assert all(estimate_tokens(chunk) <= 900 + 80 for chunk in chunks)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")